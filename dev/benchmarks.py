@@ -0,0 +1,261 @@
+"""Rough timings for Plastic's fast paths against the straightforward ones.
+
+Run from the repo root:
+    python dev/benchmarks.py [benchmark names...]
+
+Each benchmark works on a scratch SQLite file built from the test schema,
+  so no external database is needed.
+"""
+import os, sys, shutil, tempfile, tracemalloc
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from plastic.connectors.sqlite import PlasticSqlite, Sqlite_Connector
+from plastic.record import genRecordType, _cachedRecordType
+from plastic.recordset import RecordSet, BasicDataset
+from plastic.columnar import ColumnarRecordSet
+from plastic.consumers import RunningSum, RunningMax
+from plastic.parallel import Fetch, fanOut
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), '..', 'test', 'plastic', 'connectors', 'sqlite.base.sql')
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def scratchTaskClass(rows=0, connectorType=Sqlite_Connector):
+    """Make a fresh SQLite file with the test schema and a Task class bound to it."""
+    scratchDir = tempfile.mkdtemp(prefix='plastic-bench-')
+    connection = connectorType(os.path.join(scratchDir, 'bench.db'))
+    with open(SCHEMA_FILE) as rawsql:
+        for statement in rawsql.read().split(';'):
+            if statement.strip():
+                connection._execute_query(statement, [])
+    if rows:
+        connection.insertMany('task', ('active','title','description'),
+                              [(i % 2, 'Task %d' % i, 'Description of task %d' % i)
+                               for i in range(rows)])
+
+    class Task(PlasticSqlite):
+        _connection = connection
+
+    return Task, scratchDir
+
+
+def timed(label, function, count, unit='rows'):
+    start = perf_counter()
+    function()
+    elapsed = perf_counter() - start
+    print('  %-28s %8.3fs  %12.0f %s/s' % (label, elapsed, count / elapsed, unit))
+    return elapsed
+
+
+@benchmark
+def bulk_insert(count=2000):
+    """Per-row _commit() against one bulk_insert call."""
+    print('bulk_insert: %d rows' % count)
+
+    Task, scratchDir = scratchTaskClass()
+    def perRow():
+        for i in range(count):
+            task = Task()
+            task.title = 'Task %d' % i
+            task.active = i % 2
+            task._commit()
+    perRowTime = timed('per-row _commit()', perRow, count)
+    shutil.rmtree(scratchDir)
+
+    Task, scratchDir = scratchTaskClass()
+    def bulk():
+        Task.bulk_insert([{'title': 'Task %d' % i, 'active': i % 2}
+                          for i in range(count)])
+    bulkTime = timed('bulk_insert()', bulk, count)
+    shutil.rmtree(scratchDir)
+
+    print('  speedup: %.1fx' % (perRowTime / bulkTime))
+
+
+@benchmark
+def hydration(count=100000):
+    """Building instances from a find() result: through __init__ against _from_row."""
+    print('hydration: %d rows' % count)
+
+    Task, scratchDir = scratchTaskClass(count)
+    with Task._connection as plasticDB:
+        records = plasticDB.query('select %s from task' % ','.join(Task._columns))
+
+    def viaInit():
+        objects = []
+        for record in records:
+            initDict = record._asdict()
+            initDict['bypass_validation'] = True
+            objects.append(Task(**initDict))
+    initTime = timed('Task(**row, bypass...)', viaInit, count)
+
+    def viaFromRow():
+        fromRow = Task._from_row
+        objects = [fromRow(record._tuple) for record in records]
+    fromRowTime = timed('Task._from_row(row)', viaFromRow, count)
+    print('  speedup: %.1fx' % (initTime / fromRowTime))
+
+    timed('find() end to end', lambda: Task.find(Task.id[0:]), count)
+    shutil.rmtree(scratchDir)
+
+
+
+@benchmark
+def record_types(count=20000):
+    """Per-call cost of genRecordType, with and without the RecordType cache."""
+    print('record_types: %d calls' % count)
+    header = ('id', 'active', 'title', 'description')
+
+    uncached = _cachedRecordType.__wrapped__
+    def build():
+        for _ in range(count):
+            uncached(header)
+    buildTime = timed('new class per call', build, count, 'calls')
+
+    genRecordType.cache_clear()
+    def lookup():
+        for _ in range(count):
+            genRecordType(header)
+    lookupTime = timed('genRecordType (cached)', lookup, count, 'calls')
+    print('  %.2fus -> %.2fus per call, %r' % (buildTime / count * 1e6, lookupTime / count * 1e6, genRecordType.cache_info()))
+
+
+@benchmark
+def columnar(count=200000):
+    """Memory and a column sum for RecordSet against ColumnarRecordSet."""
+    print('columnar: %d rows' % count)
+    header = ('id', 'active', 'score')
+    rows = [(i, i % 2, i * 0.5) for i in range(count)]
+
+    def traced(build):
+        tracemalloc.start()
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+
+    recordSet, rowBytes = traced(lambda: RecordSet(initialData=rows, recordType=header))
+    columnar, columnBytes = traced(lambda: ColumnarRecordSet(recordSet))
+    print('  %-28s %8.1f bytes/row' % ('RecordSet', rowBytes / float(count)))
+    print('  %-28s %8.1f bytes/row' % ('ColumnarRecordSet', columnBytes / float(count)))
+
+    timed('RecordSet column sum', lambda: sum(sum(group) for group in recordSet.column('score')), count)
+    timed('ColumnarRecordSet.sum', lambda: columnar.sum('score'), count)
+
+
+@benchmark
+def incremental(groups=2000, size=10):
+    """Keeping a sum and max current as groups are appended, by rescanning against subscribing."""
+    print('incremental: %d groups of %d records' % (groups, size))
+    header = ('id', 'value')
+    batches = [[(g*size + i, (g*size + i) % 97) for i in range(size)] for g in range(groups)]
+
+    def rescan():
+        recordSet = RecordSet(recordType=header)
+        column = recordSet.column('value')
+        for batch in batches:
+            recordSet.append(batch)
+            total = sum(sum(group) for group in column)
+            largest = max(max(group) for group in column)
+    timed('full rescan per append', rescan, groups, 'appends')
+
+    def subscribed():
+        recordSet = RecordSet(recordType=header)
+        total = RunningSum(recordSet, 'value')
+        largest = RunningMax(recordSet, 'value')
+        for batch in batches:
+            recordSet.append(batch)
+            total.value, largest.value
+    timed('RunningSum + RunningMax', subscribed, groups, 'appends')
+
+
+class FakeDataset(object):
+    """Stands in for an Ignition BasicDataset, off the gateway.
+    On a gateway every one of these calls crosses into Java, so the call count matters most.
+    """
+    def __init__(self, header, columns):
+        self._header = list(header)
+        self._columns = columns
+        self.calls = 0
+
+    def getColumnNames(self):
+        return self._header
+
+    def getColumnCount(self):
+        return len(self._columns)
+
+    def getRowCount(self):
+        return len(self._columns[0])
+
+    def getValueAt(self, rix, cix):
+        self.calls += 1
+        return self._columns[cix][rix]
+
+    def getColumnAsList(self, cix):
+        self.calls += 1
+        return list(self._columns[cix])
+
+BasicDataset.register(FakeDataset)
+
+
+class CellOnlyDataset(FakeDataset):
+    """An older dataset without getColumnAsList."""
+    def __getattribute__(self, attribute):
+        if attribute == 'getColumnAsList':
+            raise AttributeError(attribute)
+        return object.__getattribute__(self, attribute)
+
+
+@benchmark
+def datasets(rows=20000, columnCount=20):
+    """Converting a dataset cell by cell against a column at a time."""
+    print('datasets: %d rows x %d columns' % (rows, columnCount))
+    header = ['c%d' % cix for cix in range(columnCount)]
+    columns = [[rix * columnCount + cix for rix in range(rows)] for cix in range(columnCount)]
+
+    cellDataset = CellOnlyDataset(header, columns)
+    timed('getValueAt per cell', lambda: RecordSet(initialData=cellDataset), rows)
+    columnDataset = FakeDataset(header, columns)
+    timed('getColumnAsList', lambda: RecordSet(initialData=columnDataset), rows)
+    timed('getColumnAsList, columnar', lambda: ColumnarRecordSet(columnDataset), rows)
+    print('  %d calls per cell, %d calls per column' % (cellDataset.calls, columnDataset.calls // 2))
+
+
+class Remote_Sqlite_Connector(Sqlite_Connector):
+    """Stands in for a database across the network: every query takes a round trip."""
+    _latency = 0.02
+
+    def _execute_query(self, query, values):
+        sleep(self._latency)
+        return super(Remote_Sqlite_Connector, self)._execute_query(query, values)
+
+
+@benchmark
+def fan_out(shardCount=8, rows=2000):
+    """Finding across shards one after another against fanned out in parallel."""
+    print('fan_out: %d shards of %d rows, %dms per query' % (shardCount, rows, Remote_Sqlite_Connector._latency * 1000))
+    shards = [scratchTaskClass(rows, Remote_Sqlite_Connector) for _ in range(shardCount)]
+
+    def sequential():
+        for Task,_ in shards:
+            Task.find(Task.active[1])
+    timed('find per shard', sequential, shardCount * rows // 2)
+    timed('fanOut', lambda: fanOut([Fetch(Task.find, Task.active[1]) for Task,_ in shards]), shardCount * rows // 2)
+
+    for _,scratchDir in shards:
+        shutil.rmtree(scratchDir)
+
+
+if __name__ == '__main__':
+    for name in (sys.argv[1:] or sorted(BENCHMARKS)):
+        BENCHMARKS[name]()
+        print('')
@@ -0,0 +1,115 @@
+"""Asyncio support for Plastic.
+
+The connectors are all blocking DB-API, so rather than pull in an async driver
+  for each engine, the blocking calls are handed to a thread executor that
+  belongs to the connection. The event loop carries on while they run.
+"""
+import asyncio, functools, threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Guards making each connection's executor
+_executorLock = threading.Lock()
+
+
+class AsyncConnection(object):
+    """Mix in ahead of an engine's connector to give it awaitable versions
+      of its calls, each run on the connection's own thread executor.
+
+      class Async_Sqlite_Connector(AsyncConnection, Sqlite_Connector): pass
+
+    _async_workers sets how many calls can be in flight at once. Left as None,
+      pooled connectors get one worker per pooled connection, and others just one
+      (they'd only wait on each other for the shared connection anyway).
+    """
+    _async_workers = None
+    _executor = None
+
+
+    @property
+    def executor(self):
+        # Made on first use, since the engine mixins don't call up to an __init__
+        if self._executor is None:
+            with _executorLock:
+                if self._executor is None:
+                    workers = self._async_workers or getattr(self, '_pool_max_size', None) or 1
+                    self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                        thread_name_prefix='plastic-async')
+        return self._executor
+
+
+    def _run_async(self, function, *args, **kwargs):
+        """Run the blocking call on the executor. Returns an awaitable for its result."""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+
+    def _execute_query_async(self, query, values):
+        return self._run_async(self._execute_query, query, values)
+
+
+    def queryAsync(self, query, params=[]):
+        """Like query, for raw SQL from async code: `await connection.queryAsync(...)`"""
+        query = query.replace('PARAM_TOKEN', self._param_token)
+        return self._execute_query_async(query, params)
+
+
+    def shutdown(self, wait=True):
+        """Stop the executor. (Another is made if the connection is used again.)"""
+        with _executorLock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class AsyncPlasticORM(object):
+    """Mix in ahead of an engine's Plastic class for awaitable versions of
+      find, get_many, count, exists, and commit.
+
+      class PlasticAsyncSqlite(AsyncPlasticORM, PlasticSqlite): pass
+
+      tasks = await Task.afind(Task.active[1])
+      await task.acommit()
+
+    The work is done by the normal (blocking) methods, through the connection's
+      _run_async if it has one (see AsyncConnection), otherwise on the loop's default executor.
+    NOTE: columns left out of an afind(columns=...) still load when first read,
+      and that blocks. Leave them out only if they won't be needed.
+    """
+
+    @classmethod
+    async def _run_async(cls, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Configuring may need to connect, so that shouldn't block either
+        if not cls._configured:
+            await loop.run_in_executor(None, cls._configure)
+        if isinstance(cls._connection, AsyncConnection):
+            return await cls._connection._run_async(function, *args, **kwargs)
+        return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+
+    @classmethod
+    async def afind(cls, *filters, **kwargs):
+        return await cls._run_async(cls.find, *filters, **kwargs)
+
+
+    @classmethod
+    async def aget_many(cls, keys, missing='skip'):
+        return await cls._run_async(cls.get_many, keys, missing=missing)
+
+
+    @classmethod
+    async def acount(cls, *filters):
+        return await cls._run_async(cls.count, *filters)
+
+
+    @classmethod
+    async def aexists(cls, *filters):
+        return await cls._run_async(cls.exists, *filters)
+
+
+    async def acommit(self):
+        """Apply the changes, if any, without blocking the loop."""
+        if self._pending:
+            await type(self)._run_async(self._commit)
@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from time import monotonic
+from weakref import WeakValueDictionary, WeakSet
+import threading
+
+
+class LRUCache(object):
+    """A size-bounded mapping that evicts the least recently used entries.
+
+    Lookups are counted as hits or misses, and evictions are tallied too,
+      so the cache can be tuned by checking its stats.
+    Set maxSize to None (or 0) to leave it unbounded.
+    """
+    def __init__(self, maxSize=1000):
+        self.maxSize = maxSize
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+
+
+    def _evict(self):
+        while self.maxSize and len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def get(self, key, default=None):
+        """Return the entry for the key (or the default), counting it as a hit or miss."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._touch(key)
+            self.hits += 1
+            return value
+
+
+    def peek(self, key, default=None):
+        """Return the entry for the key without counting or refreshing it."""
+        with self._lock:
+            return self._entries.get(key, default)
+
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._touch(key)
+            self._evict()
+
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': (self.hits / lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxSize': self.maxSize,
+        }
+
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.stats)
+
+
+class IdentityMap(LRUCache):
+    """Cache of ORM instances, keyed by their primary key values.
+
+    Normally this is an LRU with a size bound. In weak mode, instances are
+      only kept as long as something else still references them, so the
+      size bound is ignored.
+    """
+    def __init__(self, maxSize=1000, weak=False):
+        super(IdentityMap, self).__init__(maxSize)
+        self.weak = weak
+        if weak:
+            self._entries = WeakValueDictionary()
+
+
+    def _touch(self, key):
+        if not self.weak:
+            self._entries.move_to_end(key)
+
+
+    def _evict(self):
+        if not self.weak:
+            super(IdentityMap, self)._evict()
+
+
+# Every TTLCache, so writes can invalidate a tag wherever it's cached
+_ttlCaches = WeakSet()
+
+
+class TTLCache(LRUCache):
+    """An LRUCache whose entries also expire ttl seconds after they're put.
+    Set ttl to None to only ever evict (or invalidate) them.
+
+    Entries can be tagged when put, so that related entries can be invalidated 
+      together with invalidate(tag). invalidateAll(tag) does that on every TTLCache.
+
+    A value that took a while to get may be stale by the time it's put. Take the
+      generation before getting it and pass it to put, which skips it if the cache
+      was invalidated (or cleared) in the meantime.
+    """
+    def __init__(self, maxSize=1000, ttl=None):
+        super(TTLCache, self).__init__(maxSize)
+        self.ttl = ttl
+        self._tagged = {}
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+        _ttlCaches.add(self)
+
+
+    def _remove(self, key):
+        value,expires,tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+    def _evict(self):
+        while self.maxSize and len(self._entries) > self.maxSize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value,expires,tags = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._touch(key)
+            self.hits += 1
+            return value
+
+
+    def peek(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= monotonic()):
+                return default
+            return entry[0]
+
+
+    def put(self, key, value, tags=(), generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = None if self.ttl is None else monotonic() + self.ttl
+            self._entries[key] = (value, expires, tuple(tags))
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            self._evict()
+
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+
+    def invalidate(self, tag):
+        """Drop every entry put with the tag."""
+        with self._lock:
+            # Even with nothing to drop, a value being fetched for the tag may be stale now
+            self.generation += 1
+            for key in list(self._tagged.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+
+    @property
+    def stats(self):
+        stats = super(TTLCache, self).stats
+        stats['expirations'] = self.expirations
+        stats['invalidations'] = self.invalidations
+        stats['ttl'] = self.ttl
+        return stats
+
+
+def invalidateAll(tag):
+    """Invalidate the tag in every TTLCache."""
+    for cache in list(_ttlCaches):
+        cache.invalidate(tag)
@@ -1,15 +1,41 @@
+from weakref import WeakSet
 
 
 class PlasticColumn(object):
-    __slots__ = ('_parent', '_column')
+    __slots__ = ('_parent', '_column', '_shadowed')
     
 
-    def __init__(self, parentClass, columnName):
+    def __init__(self, parentClass, columnName, shadowed=None):
         # anchor to the parent class to ensure runtime modifications are considered
         self._parent = parentClass
         self._column = columnName
+        # The class's method of the same name, if the column hides one (like count)
+        self._shadowed = shadowed
     
 
+    def __get__(self, instance, owner):
+        """On an instance a column that hasn't been set reads as the PlasticColumn itself,
+          unless a find() left it out. Then it's loaded (for the whole find) right now.
+        Once the instance has a value, it's found before this is ever asked.
+        """
+        if instance is None:
+            return self
+        deferred = instance.__dict__.get('_deferred')
+        if deferred is not None and self._column in deferred.columns:
+            deferred.load(self._column)
+            return instance.__dict__.get(self._column, self)
+        return self
+    
+
+    def __call__(self, *args, **kwargs):
+        """A column named like one of the class's methods still works as that method
+          when called, so a table with a count column can still count(), say.
+        """
+        if self._shadowed is None:
+            raise TypeError("Column %s is not callable" % self.fqn)
+        return self._shadowed(*args, **kwargs)
+
+
     def dereference(self, selector):
         if isinstance(selector, PlasticColumn):
             return selector.fqn
@@ -53,7 +79,7 @@ class PlasticColumn(object):
         
         elif isinstance(selector, (tuple,list)):
             if len(selector) == 1:
-                return ' (%s = PARAM_TOKEN) ' % self.fqn, (self.dereference(selector),)
+                return ' (%s = PARAM_TOKEN) ' % self.fqn, (self.dereference(selector[0]),)
             
             else:
                 return ' (%s in (%s)) ' % (self.fqn, ','.join(['PARAM_TOKEN']*len(selector))), tuple(selector)
@@ -62,6 +88,21 @@ class PlasticColumn(object):
             return ' (%s = PARAM_TOKEN) ' % self.fqn, (self.dereference(selector),)
     
 
+    @property
+    def asc(self):
+        return SortOrder(self)
+
+
+    @property
+    def desc(self):
+        """Mark the column to sort descending, as in Table.find(order_by=Table.ID.desc)"""
+        return SortOrder(self, descending=True)
+
+
+    def __neg__(self):
+        return self.desc
+
+
     def isNull(self):
         return ' (%s is null) ' % self.fqn, tuple()
 
@@ -72,4 +113,78 @@ class PlasticColumn(object):
 
     def __bool__(self):
         # Always appear like None when not in comparisons
-        return None
\ No newline at end of file
+        return None
+
+
+class SortOrder(object):
+    """A column to sort by, and which way. Made by PlasticColumn.asc and .desc (or -column)."""
+    __slots__ = ('column', 'descending')
+
+
+    def __init__(self, column, descending=False):
+        self.column = column
+        self.descending = descending
+
+
+    def __neg__(self):
+        return SortOrder(self.column, not self.descending)
+
+
+    def __repr__(self):
+        return '%s %s' % (self.column.fqn, 'desc' if self.descending else 'asc')
+
+
+class DeferredColumns(object):
+    """The columns a find() left out, shared by all the instances it made.
+
+    The first time one of those columns is read on any of them, it's loaded for
+      all of them at once: one query per chunk of keys, instead of one per instance.
+    """
+    __slots__ = ('_parent', 'columns', '_instances')
+
+
+    def __init__(self, parentClass, columns):
+        self._parent = parentClass
+        self.columns = set(columns)
+        self._instances = WeakSet()
+
+
+    def add(self, instance):
+        self._instances.add(instance)
+        instance.__dict__['_deferred'] = self
+
+
+    def load(self, column):
+        """Fill in the column on every instance still waiting for it."""
+        cls = self._parent
+        self.columns.discard(column)
+        
+        waiting = {}
+        for instance in list(self._instances):
+            if not column in instance.__dict__:
+                waiting.setdefault(instance._keyValues, []).append(instance)
+        if not waiting:
+            return
+        
+        selected = cls._projection((column,))
+        keyIxs = [selected.index(key) for key in cls._primary_key_cols]
+        columnIx = selected.index(column)
+        
+        keys = list(waiting)
+        chunkSize = max(1, cls._connection._max_params // len(cls._primary_key_cols))
+        with cls._connection as plasticDB:
+            for start in range(0, len(keys), chunkSize):
+                recordsQuery, values = cls._filterQuery(plasticDB, [cls._keyFilter(keys[start:start+chunkSize])], selected)
+                for record in plasticDB.query(recordsQuery, values):
+                    row = record._tuple
+                    for instance in waiting.pop(tuple(row[ix] for ix in keyIxs), ()):
+                        instance.__dict__[column] = row[columnIx]
+        
+        # Whatever's left was deleted out from under us
+        for instances in waiting.values():
+            for instance in instances:
+                instance.__dict__[column] = None
+
+
+    def __repr__(self):
+        return 'DeferredColumns(%s, %d instances)' % (', '.join(sorted(self.columns)), len(self._instances))
@@ -0,0 +1,273 @@
+from .record import RecordType, genRecordType
+from .recordset import datasetColumns, isDataset
+
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _typecodeFor(values):
+    """Pick the array typecode that can hold all the values, or None if they need a list.
+    Bools are left as objects so they come back as bools.
+    """
+    kinds = set(type(value) for value in values)
+    if kinds == set([int]):
+        return 'q'
+    if kinds and kinds <= set([int, float]):
+        return 'd'
+    return None
+
+
+class ColumnarRecordSet(object):
+    """A RecordSet variant that stores each column in one contiguous buffer,
+      rather than a Python object per record.
+
+    Numeric columns are kept in typed array.arrays (64-bit ints or doubles),
+      and anything else falls back to a plain list for that column.
+    Records are only made on demand, as views of a row.
+
+    Like RecordSet, data is added in groups, and len() is the number of groups.
+
+    column() hands back the buffer itself without copying: a numpy array
+      over it if NumPy is available, otherwise a memoryview. The aggregates
+      (sum, min, max, mean) run vectorized on NumPy when it can.
+    """
+    __slots__ = ('__weakref__', '_RecordType', '_buffers', '_offsets')
+
+
+    def __init__(self, initialData=None, recordType=None, columns=None):
+        """Give a recordType (or header) along with either rows of initialData
+          or a sequence of columns, one per field.
+        Alternatively a RecordSet or an Ignition dataset can be given as the initialData.
+        """
+        if initialData is not None and isDataset(initialData):
+            recordType = genRecordType(initialData.getColumnNames())
+            columns = datasetColumns(initialData)
+            initialData = None
+        elif initialData is not None and hasattr(initialData, '_groups'):
+            recordType = initialData._RecordType
+
+        if recordType is None:
+            raise ValueError("""Insufficient information to initialize the ColumnarRecordSet."""
+                             """ A RecordType must be implied by the constructor arguments.""")
+        if not (isinstance(recordType, type) and issubclass(recordType, RecordType)):
+            recordType = genRecordType(recordType)
+
+        self._RecordType = recordType
+        self._buffers = [None]*len(recordType._fields)
+        self._offsets = [0]
+
+        if columns is not None:
+            self.appendColumns(columns)
+        elif initialData is not None and hasattr(initialData, '_groups'):
+            for group in initialData.groups:
+                self.append(group)
+        elif initialData:
+            self.append(initialData)
+
+
+    @classmethod
+    def fromRecordSet(cls, recordSet):
+        return cls(recordSet)
+
+
+    @classmethod
+    def fromDataset(cls, dataset):
+        """Load an Ignition dataset straight into the column buffers,
+          without making any records along the way.
+        """
+        return cls(dataset)
+
+
+    def _extendBuffer(self, ix, values):
+        buffer = self._buffers[ix]
+
+        if buffer is None:
+            typecode = _typecodeFor(values)
+            if typecode:
+                try:
+                    self._buffers[ix] = array(typecode, values)
+                    return
+                except OverflowError:
+                    pass
+            self._buffers[ix] = list(values)
+            return
+
+        if isinstance(buffer, list):
+            buffer.extend(values)
+            return
+
+        typecode = _typecodeFor(values)
+        if typecode is None:
+            # Mixed types (or None) from here on, so it has to be objects
+            self._buffers[ix] = list(buffer) + list(values)
+            return
+        if buffer.typecode == 'q' and typecode == 'd':
+            # Widen ints to doubles, like arithmetic would
+            self._buffers[ix] = buffer = array('d', buffer)
+
+        try:
+            buffer.extend(values)
+        except BufferError:
+            # Someone holds a view of the buffer, so it can't be resized.
+            #   Their view keeps the old data; we carry on with a copy.
+            self._buffers[ix] = array(buffer.typecode, buffer)
+            self._buffers[ix].extend(values)
+        except OverflowError:
+            self._buffers[ix] = list(buffer) + list(values)
+
+
+    def appendColumns(self, columns):
+        """Append a group given as one sequence of values per column."""
+        columns = [list(column) for column in columns]
+        assert len(columns) == len(self._RecordType._fields), 'Expected %d columns, but got %d' % (len(self._RecordType._fields), len(columns))
+        groupLength = len(columns[0]) if columns else 0
+        assert all(len(column) == groupLength for column in columns), 'All columns in a group must be the same length'
+
+        for ix,values in enumerate(columns):
+            self._extendBuffer(ix, values)
+        self._offsets.append(self._offsets[-1] + groupLength)
+
+
+    def append(self, addition):
+        """Append the group of records (or tuples) to the end.
+           If a single record is given, a group of one will be appended.
+        """
+        if isinstance(addition, RecordType):
+            addition = [addition]
+        rows = [tuple(row) for row in addition]
+        if rows:
+            self.appendColumns(zip(*rows))
+        else:
+            self._offsets.append(self._offsets[-1])
+
+
+    def extend(self, additionalGroups):
+        for group in additionalGroups:
+            self.append(group)
+
+
+    def column(self, column):
+        """Returns the column's buffer, without copying it."""
+        buffer = self._buffers[self._RecordType._lookup[column]]
+        if buffer is None:
+            return []
+        if isinstance(buffer, list):
+            return buffer
+        if numpy is not None:
+            return numpy.frombuffer(buffer, dtype=numpy.int64 if buffer.typecode == 'q' else numpy.float64)
+        return memoryview(buffer)
+
+
+    def _values(self, column):
+        buffer = self._buffers[self._RecordType._lookup[column]] or []
+        if isinstance(buffer, list):
+            return [value for value in buffer if value is not None]
+        return buffer
+
+
+    def sum(self, column):
+        values = self._values(column)
+        if numpy is not None and isinstance(values, array):
+            return self.column(column).sum().item()
+        return sum(values)
+
+
+    def min(self, column):
+        values = self._values(column)
+        if numpy is not None and isinstance(values, array) and len(values):
+            return self.column(column).min().item()
+        return min(values) if len(values) else None
+
+
+    def max(self, column):
+        values = self._values(column)
+        if numpy is not None and isinstance(values, array) and len(values):
+            return self.column(column).max().item()
+        return max(values) if len(values) else None
+
+
+    def mean(self, column):
+        values = self._values(column)
+        if not len(values):
+            return None
+        if numpy is not None and isinstance(values, array):
+            return self.column(column).mean().item()
+        return sum(values) / float(len(values))
+
+
+    # Sized
+    def __len__(self):
+        """Like RecordSet, this is the number of groups."""
+        return len(self._offsets) - 1
+
+
+    @property
+    def recordCount(self):
+        return self._offsets[-1]
+
+
+    def _row(self, index):
+        if len(self._buffers) == 1:
+            # Single field records take the bare value
+            return self._RecordType(self._buffers[0][index])
+        return self._RecordType(tuple(buffer[index] for buffer in self._buffers))
+
+
+    def __getitem__(self, selector):
+        """Records are made on demand for int selections (and slices)."""
+        if isinstance(selector, tuple):
+            column,slicer = selector
+            return self.column(column)[slicer]
+        elif isinstance(selector, slice):
+            return islice(self.records, selector.start, selector.stop, selector.step)
+        elif isinstance(selector, int):
+            if selector < 0:
+                selector += self.recordCount
+            if not 0 <= selector < self.recordCount:
+                raise IndexError("There are not enough records in the groups to meet the index %d" % selector)
+            return self._row(selector)
+        else:
+            raise NotImplementedError("The selector '%r' is not implemented" % selector)
+
+
+    def group(self, groupIndex):
+        return tuple(self._row(ix)
+                     for ix
+                     in range(self._offsets[groupIndex], self._offsets[groupIndex+1]))
+
+
+    def groupOf(self, index):
+        """Which group the record index is in."""
+        return bisect_right(self._offsets, index) - 1
+
+
+    @property
+    def groups(self):
+        return (self.group(gix) for gix in range(len(self)))
+
+
+    @property
+    def records(self):
+        return (self._row(ix) for ix in range(self.recordCount))
+
+
+    def __iter__(self):
+        return self.records
+
+
+    def __str__(self):
+        return 'ColumnarRecordSet=%r' % repr(self._RecordType._fields)
+
+
+    def __repr__(self):
+        return '<ColumnarRecordSet with %d groups of %d records: %s>' % (
+            len(self), self.recordCount, ', '.join(
+                '%s[%s]' % (field, 'object' if isinstance(buffer, list) or buffer is None else buffer.typecode)
+                for field, buffer
+                in zip(self._RecordType._fields, self._buffers)))
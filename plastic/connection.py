@@ -1,7 +1,10 @@
 
 import functools, textwrap
 
+from contextlib import contextmanager
+
 from .connectors._template import _Template_PlasticORM_Connection
+from .cache import LRUCache
 
 
 META_QUERIES = {}
@@ -13,6 +16,13 @@ META_QUERIES[None] = {
         values
             (%s)
         """),
+    'insert_many': textwrap.dedent("""
+        -- Multi-row insert from PlasticORM_Connection
+        insert into %s
+            (%s)
+        values
+            %s
+        """),
     'update': textwrap.dedent("""
         -- Update from PlasticORM_Connection
         update %s
@@ -24,9 +34,45 @@ META_QUERIES[None] = {
         select %s
         from %s
         where %s
-        """)
+        """),
+    # Appended to basic_filtered for find's order_by, limit, and offset
+    'order_by': 'order by %s\n',
+    'order_asc': '%s asc',
+    'order_desc': '%s desc',
+    'limit': 'limit PARAM_TOKEN\n',
+    'limit_offset': 'limit PARAM_TOKEN offset PARAM_TOKEN\n',
+    'offset': 'offset PARAM_TOKEN\n',
+    'aggregate': textwrap.dedent("""
+        -- Aggregate query for PlasticORM
+        select %s
+        from %s
+        where %s
+        """),
+    'group_by': 'group by %s\n',
+    'delete': textwrap.dedent("""
+        -- Delete from PlasticORM_Connection
+        delete from %s
+        where %s
+        """),
+    'exists': textwrap.dedent("""
+        -- Existence check for PlasticORM
+        select case when exists (
+            select 1
+            from %s
+            where %s
+            ) then 1 else 0 end as found
+        """),
+    # The aggregate functions, applied to a column (or every record, for count_all)
+    'count_all': 'count(*)',
+    'count': 'count(%s)',
+    'sum': 'sum(%s)',
+    'min': 'min(%s)',
+    'max': 'max(%s)',
+    'avg': 'avg(%s)',
 }
 
+AGGREGATE_FUNCTIONS = ('count', 'sum', 'min', 'max', 'avg')
+
 
 class PlasticORM_Connection_Base(_Template_PlasticORM_Connection):
     """Helper class for connecting to the database.
@@ -35,6 +81,12 @@ class PlasticORM_Connection_Base(_Template_PlasticORM_Connection):
     _engine = ''
     _param_token = 'PARAM_TOKEN'
     _keep_alive = True
+    # Most parameters that can be bound in a single statement
+    _max_params = 999
+    # Final SQL text is cached by the shape of the statement (up to this many)
+    _statement_cache_size = 256
+    _statementCache = None
+    _inBlock = False
     connection = None
 
 
@@ -54,8 +106,34 @@ class PlasticORM_Connection_Base(_Template_PlasticORM_Connection):
     
 
     def _get_query_template(self, queryType):
-        qt = META_QUERIES[self._engine].get(queryType) or META_QUERIES[None][queryType]
+        return self._cached_statement(('template', queryType), 
+                                      lambda: self._build_query_template(queryType))
+
+
+    def _build_query_template(self, queryType):
+        qt = META_QUERIES.get(self._engine, {}).get(queryType) or META_QUERIES[None][queryType]
         return qt.replace('PARAM_TOKEN',self._param_token)
+
+
+    def _cached_statement(self, key, build):
+        """Return the SQL for the statement key, calling build() to make it if it's not cached.
+
+        Keys should capture everything that changes the text: the operation, the table,
+          the columns involved, and the shape of any filters. Never the values!
+        """
+        statement = self.statementCache.get(key)
+        if statement is None:
+            statement = build().replace('PARAM_TOKEN', self._param_token)
+            self.statementCache.put(key, statement)
+        return statement
+
+
+    @property
+    def statementCache(self):
+        # Made on first use, since the engine mixins don't call up to this __init__
+        if self._statementCache is None:
+            self._statementCache = LRUCache(self._statement_cache_size)
+        return self._statementCache
     
 
     # @dumpCore
@@ -64,34 +142,191 @@ class PlasticORM_Connection_Base(_Template_PlasticORM_Connection):
         return self._execute_query(query,params)
 
 
+    @contextmanager
+    def _streamingConnection(self):
+        """Hold a connection to stream results over, without keeping this connector's
+          block (and its lock) open between batches.
+
+        Inside a block on this thread, the block's connection is used, so the stream
+          sees its uncommitted changes. Otherwise one is opened just for the stream.
+        """
+        if self._inBlock:
+            with self as plasticDB:
+                yield plasticDB.connection
+            return
+        
+        connection = self._open_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+
+    def queryIter(self, query, params=[], batchSize=1000):
+        """Run the query, yielding the results as RecordSets of up to batchSize records."""
+        query = query.replace('PARAM_TOKEN', self._param_token)
+        return self._execute_query_iter(query, params, batchSize)
+
+
     def queryOne(self,query,params=[]):
         return self.query(query,params)[0]
 
 
     # @dumpCore
     def insert(self, table, columns, values):
-        insertQuery = self._get_query_template('insert')
-        insertQuery %= (table, 
-                        ','.join(columns), 
-                        ','.join([self._param_token]*len(values)))
+        def build():
+            insertQuery = self._get_query_template('insert')
+            return insertQuery % (table, 
+                                  ','.join(columns), 
+                                  ','.join([self._param_token]*len(values)))
         
-        insertQuery = insertQuery.replace('PARAM_TOKEN', self._param_token)
+        insertQuery = self._cached_statement(('insert', table, tuple(columns)), build)
         return self._execute_insert(insertQuery,values)
+
+
+    def insertMany(self, table, columns, rows):
+        """Insert many rows of values for the same columns.
+        Rows are chunked into multi-row inserts that stay under the engine's
+          parameter limit, and all of them are applied in one transaction.
+          (Engines without multi-row inserts get one insert per row instead.)
+        Returns the row ID generated for each row, in order.
+        """
+        if not self._multi_row_insert:
+            with self as plasticDB:
+                return [plasticDB.insert(table, columns, row) for row in rows]
+        
+        rowsPerChunk = max(1, self._max_params // max(1, len(columns)))
+        rowTemplate = '(%s)' % ','.join([self._param_token]*len(columns))
+        
+        def build(rowCount):
+            insertQuery = self._get_query_template('insert_many')
+            return insertQuery % (table,
+                                  ','.join(columns),
+                                  ','.join([rowTemplate]*rowCount))
+        
+        rowIDs = []
+        with self as plasticDB:
+            for start in range(0, len(rows), rowsPerChunk):
+                chunk = rows[start:start+rowsPerChunk]
+                
+                # Only full chunks (and the one remainder) repeat, so this caches well
+                insertQuery = self._cached_statement(('insert_many', table, tuple(columns), len(chunk)),
+                                                     lambda: build(len(chunk)))
+                
+                values = [value for row in chunk for value in row]
+                rowIDs.extend(plasticDB._execute_insert_many(insertQuery, values, len(chunk)))
+        return rowIDs
     
     
+    def _update_statement(self, table, setColumns, keyColumns):
+        def build():
+            updateQuery = self._get_query_template('update')
+            return updateQuery % (table, 
+                                  ','.join('%s=%s' % (setColumn, self._param_token)
+                                           for setColumn 
+                                           in setColumns), 
+                                  '\n\t and '.join('%s=%s' % (keyColumn, self._param_token)
+                                                   for keyColumn 
+                                                   in keyColumns))
+        
+        return self._cached_statement(('update', table, tuple(setColumns), tuple(keyColumns)), build)
+
+
     # @dumpCore
     def update(self, table, setDict, keyDict):
         setColumns,setValues = zip(*sorted(setDict.items()))
         keyColumns,keyValues = zip(*sorted(keyDict.items()))
         
-        updateQuery = self._get_query_template('update')
-        updateQuery %= (table, 
-                        ','.join('%s=%s' % (setColumn, self._param_token)
-                                 for setColumn 
-                                 in setColumns), 
-                        '\n\t and '.join('%s=%s' % (keyColumn, self._param_token)
-                                         for keyColumn 
-                                         in keyColumns))
+        updateQuery = self._update_statement(table, setColumns, keyColumns)
+        return self._execute_update(updateQuery, setValues+keyValues)
+
+
+    def updateWhere(self, table, setDict, conditions, conditionValues):
+        """Update every record matching the conditions (joined with 'and') in one statement.
+        Returns the number of rows changed.
+        """
+        setColumns,setValues = zip(*sorted(setDict.items()))
+        conditions = tuple(conditions)
         
-        updateQuery = updateQuery.replace('PARAM_TOKEN', self._param_token)
-        self._execute_update(updateQuery, setValues+keyValues)
+        def build():
+            updateQuery = self._get_query_template('update')
+            return updateQuery % (table,
+                                  ','.join('%s=%s' % (setColumn, self._param_token)
+                                           for setColumn
+                                           in setColumns),
+                                  '\n\t and '.join(conditions))
+        
+        updateQuery = self._cached_statement(('update_where', table, setColumns, conditions), build)
+        return self._execute_update(updateQuery, list(setValues) + list(conditionValues))
+
+
+    def deleteWhere(self, table, conditions, conditionValues):
+        """Delete every record matching the conditions (joined with 'and') in one statement.
+        Returns the number of rows deleted.
+        """
+        conditions = tuple(conditions)
+        
+        def build():
+            deleteQuery = self._get_query_template('delete')
+            return deleteQuery % (table, '\n\t and '.join(conditions))
+        
+        deleteQuery = self._cached_statement(('delete', table, conditions), build)
+        return self._execute_update(deleteQuery, list(conditionValues))
+
+
+    def updateMany(self, table, setColumns, keyColumns, rows):
+        """Update many records with the same set of columns changed.
+        Each row is the record's set values followed by its key values, in column order.
+        The one statement is sent for all the rows (with executemany, where the engine can).
+        Returns the number of rows changed.
+        """
+        updateQuery = self._update_statement(table, setColumns, keyColumns)
+        with self as plasticDB:
+            return plasticDB._execute_update_many(updateQuery, rows)
+
+
+    @property
+    def supportsUpsert(self):
+        """True if the engine has a single statement upsert configured in META_QUERIES."""
+        return 'upsert' in META_QUERIES.get(self._engine, {})
+
+
+    def _upsert_statement(self, table, columns, keyColumns, rowCount):
+        def build():
+            # If there's nothing but keys, a no-op update still lets the statement through
+            updateColumns = [column for column in columns if not column in keyColumns] or keyColumns
+            rowTemplate = '(%s)' % ','.join([self._param_token]*len(columns))
+            setTemplate = self._get_query_template('upsert_set')
+            
+            upsertQuery = self._get_query_template('upsert')
+            return upsertQuery % {
+                'table': table,
+                'columns': ','.join(columns),
+                'values': ','.join([rowTemplate]*rowCount),
+                'keys': ','.join(keyColumns),
+                'updates': ','.join(setTemplate % {'column': column} 
+                                    for column 
+                                    in updateColumns),
+                }
+        
+        return self._cached_statement(('upsert', table, tuple(columns), tuple(keyColumns), rowCount), build)
+
+
+    def upsert(self, table, columns, values, keyColumns):
+        """Insert the record, or update it if a record with the same keys exists, in one statement.
+        The non-key columns given are what gets updated.
+        """
+        upsertQuery = self._upsert_statement(table, columns, keyColumns, 1)
+        self._execute_update(upsertQuery, values)
+
+
+    def upsertMany(self, table, columns, rows, keyColumns):
+        """Upsert many rows of values for the same columns, chunked under the 
+          engine's parameter limit and all in one transaction.
+        """
+        rowsPerChunk = max(1, self._max_params // max(1, len(columns)))
+        with self as plasticDB:
+            for start in range(0, len(rows), rowsPerChunk):
+                chunk = rows[start:start+rowsPerChunk]
+                upsertQuery = self._upsert_statement(table, columns, keyColumns, len(chunk))
+                plasticDB._execute_update(upsertQuery, [value for row in chunk for value in row])
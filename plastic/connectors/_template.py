@@ -1,8 +1,12 @@
+from ..recordset import RecordSet
 
 
 class _Template_PlasticORM_Connection(object):
     _engine = None
     _param_token = 'PARAM_TOKEN'
+    # Set to True for engines that implement _execute_insert_many.
+    #   Otherwise insertMany inserts the rows one at a time.
+    _multi_row_insert = False
     
 
     """Enables mixins to be properly error'd if missing methods."""
@@ -23,14 +27,32 @@ class _Template_PlasticORM_Connection(object):
         raise NotImplementedError("DB engines should be made as a mixin.")
 
 
+    def _execute_query_iter(self, query, values, batchSize):
+        """Fallback for engines without a streaming cursor: chunk up the full result."""
+        records = list(self._execute_query(query, values))
+        for start in range(0, len(records), batchSize):
+            yield RecordSet(initialData=records[start:start+batchSize])
+
+
     def _execute_insert(self, insertQuery, insertValues):
         raise NotImplementedError("DB engines should be made as a mixin.")
 
 
+    def _execute_insert_many(self, insertQuery, insertValues, rowCount):
+        raise NotImplementedError("DB engines should be made as a mixin.")
+
+
     def _execute_update(self, updateQuery, updateValues):
         raise NotImplementedError("DB engines should be made as a mixin.")
 
 
+    def _execute_update_many(self, updateQuery, updateRows):
+        """Fallback for engines without executemany: one update per row."""
+        for updateValues in updateRows:
+            self._execute_update(updateQuery, updateValues)
+        return len(updateRows)
+
+
     def primaryKeys(self, schema, table):
         pkQuery = self._get_query_template('primaryKeys')
         return self.query(pkQuery, [table, schema])
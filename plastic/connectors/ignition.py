@@ -57,10 +57,11 @@ class Ignition_Connector(PlasticORM_Connection_Base):
 
 
     def _execute_update(self, updateQuery, updateValues):
+        """Returns the number of rows changed."""
         if self.tx:
-            system.db.runPrepUpdate(updateQuery, updateValues, self.dbName, self.tx, getKey=0)
+            return system.db.runPrepUpdate(updateQuery, updateValues, self.dbName, self.tx, getKey=0)
         else:
-            system.db.runPrepUpdate(updateQuery, updateValues, self.dbName, getKey=0)
+            return system.db.runPrepUpdate(updateQuery, updateValues, self.dbName, getKey=0)
 
 
 class PlasticIgnition(PlasticORM_Base):
@@ -4,11 +4,14 @@ import pymysql
 # except ImportError:
 #     import pymysql as mysql_connector
 
-import textwrap
+import textwrap, threading, weakref
 
 from ..recordset import RecordSet
+from ..record import genRecordType
 from ..connection import META_QUERIES, PlasticORM_Connection_Base
 from ..plastic import PlasticORM_Base
+from ..pool import PooledConnection
+from ..aio import AsyncConnection, AsyncPlasticORM
 
 
 META_QUERIES['mysql'] = {
@@ -36,6 +39,18 @@ META_QUERIES['mysql'] = {
                 and c.table_schema = PARAM_TOKEN
             order by c.ordinal_position
             """),
+    'upsert': textwrap.dedent("""
+            -- Upsert from PlasticORM_Connection
+            insert into %(table)s
+                (%(columns)s)
+            values
+                %(values)s
+            on duplicate key update
+                %(updates)s
+            """),
+    'upsert_set': '%(column)s = values(%(column)s)',
+    # MySQL can't offset without a limit, so use the largest one
+    'offset': 'limit 18446744073709551615 offset PARAM_TOKEN\n',
     }
 
 
@@ -43,15 +58,39 @@ class Mysql_Connector(PlasticORM_Connection_Base):
     _engine = 'mysql'
     _param_token = '%s'
     _keep_alive = True
+    # Placeholder limit for a MySQL prepared statement
+    _max_params = 65535
+    _multi_row_insert = True
+    _depth = 0
+    _autoIncrement = None
     connection = None
 
 
     def __init__(self, configDict):
         self.config = configDict
-        if self._keep_alive:
-            self.connect()
-        else:
-            self.connection = None
+        # Blocks are serialized across threads, since they share the connection
+        self._lock = threading.RLock()
+        # Connect on first use, so classes can be defined without a live database
+        #   (say, when their schema is cached)
+        self.connection = None
+
+
+    def _open_connection(self):
+        return pymysql.connect(**self.config)
+
+
+    def _ping(self, connection):
+        connection.ping(reconnect=False)
+
+
+    def _end_transaction(self, connection, excType):
+        # Commit changes before closing
+        #   A generator closed early (GeneratorExit) isn't a failure.
+        if not connection.get_autocommit():
+            if excType is None or excType is GeneratorExit:
+                connection.commit()
+            else:
+                connection.rollback()
     
 
     def connect(self, forceReconnect=False):
@@ -60,24 +99,48 @@ class Mysql_Connector(PlasticORM_Connection_Base):
             self.connection = None
 
         if self.connection is None:
-            self.connection = pymysql.connect(**self.config)
+            self.connection = self._open_connection()
 
 
     def __enter__(self):
-        self.connect()
+        self._lock.acquire()
+        try:
+            self.connect()
+        except:
+            self._lock.release()
+            raise
+        self._depth += 1
         return self
     
 
-    def __exit__(self, *args):
-        if not self.connection == None:
-            # Commit changes before closing
-            if not self.connection.autocommit:
-                self.connection.commit()
-            if not self._keep_alive:
-                self.connection.close()
-                self.connection = None
+    def __exit__(self, excType, *args):
+        try:
+            # Only the outermost block ends the transaction
+            self._depth -= 1
+            if self._depth:
+                return
+            
+            if not self.connection == None:
+                self._end_transaction(self.connection, excType)
+                if not self._keep_alive:
+                    self.connection.close()
+                    self.connection = None
+        finally:
+            self._lock.release()
     
 
+    @property
+    def _inBlock(self):
+        """True if this thread is inside a `with` block on the connector."""
+        # The lock is reentrant, so it's only free to this thread if no one else holds it
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            return self._depth > 0
+        finally:
+            self._lock.release()
+
+
     # Override these depending on the DB engine
     def _execute_query(self, query, values):
         """Execute a query. Returns rows of data."""
@@ -88,19 +151,107 @@ class Mysql_Connector(PlasticORM_Connection_Base):
         return rs    
     
 
+    def _execute_query_iter(self, query, values, batchSize):
+        """Execute a query. Yields rows of data in RecordSets of up to batchSize records.
+        NOTE: the rows are unbuffered on the server-side cursor, so the connection
+          streaming them can't be used for anything else until the iteration finishes.
+          Outside of a block that's a connection of its own (see _streamingConnection).
+        """
+        with self._streamingConnection() as connection:
+            cursor = connection.cursor(pymysql.cursors.SSCursor)
+            try:
+                cursor.execute(query,values)
+                recordType = genRecordType(next(zip(*cursor.description)))
+                while True:
+                    rows = cursor.fetchmany(batchSize)
+                    if not rows:
+                        break
+                    yield RecordSet(initialData=rows, recordType=recordType)
+            finally:
+                # Reads off whatever's left, so the connection can be used again
+                cursor.close()
+    
+
     def _execute_insert(self, insertQuery, insertValues):
         """Execute an insert query. Returns an integer for the row inserted."""
         with self as plasticDB:
             cursor = plasticDB.connection.cursor()
             cursor.execute(insertQuery,insertValues)
             return cursor.lastrowid
+
+
+    def insertMany(self, table, columns, rows):
+        """Multi-row inserts only report the first id generated, which is only enough
+          when the statement's ids are consecutive. Under interleaved auto-increment locking
+          (innodb_autoinc_lock_mode=2, MySQL 8's default) they needn't be, so rows are 
+          inserted one at a time instead (still in one transaction).
+        """
+        with self as plasticDB:
+            if plasticDB._auto_increment_settings(plasticDB.connection)[1] == 2:
+                return [plasticDB.insert(table, columns, row) for row in rows]
+            return super(Mysql_Connector, plasticDB).insertMany(table, columns, rows)
+
+
+    def _execute_insert_many(self, insertQuery, insertValues, rowCount):
+        """Execute a multi-row insert query. Returns a list of the rows inserted.
+        NOTE: the ids are only right for the traditional or consecutive lock modes 
+          (innodb_autoinc_lock_mode 0 or 1), where a multi-row insert is given one block 
+          of ids, spaced by auto_increment_increment. insertMany checks for that.
+        """
+        with self as plasticDB:
+            cursor = plasticDB.connection.cursor()
+            cursor.execute(insertQuery, insertValues)
+            # MySQL reports the first id generated for the statement.
+            #   Read it before anything else runs on the cursor and resets it.
+            firstID = cursor.lastrowid
+            step = plasticDB._auto_increment_settings(plasticDB.connection)[0]
+            return list(range(firstID, firstID + rowCount*step, step))
+
+
+    def _auto_increment_settings(self, connection):
+        """The connection's auto_increment_increment and innodb_autoinc_lock_mode, looked up once."""
+        # Made on first use, since the pooled connectors don't call up to __init__
+        if self._autoIncrement is None:
+            self._autoIncrement = weakref.WeakKeyDictionary()
+        settings = self._autoIncrement.get(connection)
+        if settings is None:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('select @@session.auto_increment_increment, @@innodb_autoinc_lock_mode')
+                settings = self._autoIncrement[connection] = tuple(int(value) for value in cursor.fetchone())
+            finally:
+                cursor.close()
+        return settings
         
 
     def _execute_update(self, updateQuery, updateValues):
-        """Execute an updated query. Returns nothing."""
+        """Execute an updated query. Returns the number of rows changed."""
         with self as plasticDB:
             cursor = plasticDB.connection.cursor()
             cursor.execute(updateQuery,updateValues)
+            return cursor.rowcount
+
+
+    def _execute_update_many(self, updateQuery, updateRows):
+        """Execute an update query for each row of values. Returns the number of rows changed."""
+        with self as plasticDB:
+            cursor = plasticDB.connection.cursor()
+            cursor.executemany(updateQuery, updateRows)
+            return cursor.rowcount
+
+
+class Pooled_Mysql_Connector(PooledConnection, Mysql_Connector):
+    """Checks out a connection from a pool for each `with` block, so threads
+      can work in parallel. Tune the pool with the _pool_* settings.
+    """
+    pass
+
+
+class Async_Mysql_Connector(AsyncConnection, Pooled_Mysql_Connector):
+    """Awaitable calls, run on as many threads as the pool has connections,
+      so that many requests' round trips overlap.
+    """
+    pass
 
 
 class PlasticMysql(PlasticORM_Base):
@@ -115,4 +266,16 @@ class PlasticMysql(PlasticORM_Base):
         password='**********',
     )
 
-    pass
\ No newline at end of file
+    pass
+
+
+class PlasticPooledMysql(PlasticMysql):
+    _connectionType = Pooled_Mysql_Connector
+
+    pass
+
+
+class PlasticAsyncMysql(AsyncPlasticORM, PlasticMysql):
+    _connectionType = Async_Mysql_Connector
+
+    pass
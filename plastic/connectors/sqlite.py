@@ -1,10 +1,13 @@
-import sqlite3
+import sqlite3, threading
 
 import textwrap
 
 from ..recordset import RecordSet
+from ..record import genRecordType
 from ..connection import META_QUERIES, PlasticORM_Connection_Base
 from ..plastic import PlasticORM_Base
+from ..pool import PooledConnection, ThreadConnectionPool
+from ..aio import AsyncConnection, AsyncPlasticORM
 
 
 META_QUERIES['sqlite'] = {
@@ -18,6 +21,18 @@ META_QUERIES['sqlite'] = {
             -- NOTE: requires additional processing!
             PRAGMA table_info(PARAM_TOKEN)
             """),
+    'upsert': textwrap.dedent("""
+            -- Upsert from PlasticORM_Connection using SQLite3 (3.24+)
+            insert into %(table)s
+                (%(columns)s)
+            values
+                %(values)s
+            on conflict (%(keys)s) do update
+            set %(updates)s
+            """),
+    'upsert_set': '%(column)s = excluded.%(column)s',
+    # SQLite can't offset without a limit, but a negative one means none
+    'offset': 'limit -1 offset PARAM_TOKEN\n',
 }
 
 
@@ -25,15 +40,44 @@ class Sqlite_Connector(PlasticORM_Connection_Base):
     _engine = 'sqlite'
     _param_token = '?'
     _keep_alive = True
+    # SQLITE_MAX_VARIABLE_NUMBER was raised from 999 in 3.32.0
+    _max_params = 32766 if sqlite3.sqlite_version_info >= (3,32,0) else 999
+    # ON CONFLICT ... DO UPDATE came in 3.24.0. Before that, upserts are done row by row.
+    supportsUpsert = sqlite3.sqlite_version_info >= (3,24,0)
+    _multi_row_insert = True
+    _depth = 0
     connection = None
     
     
     def __init__(self, dbFile=':memory:'):
         self.config = dbFile
-        if self._keep_alive:
-            self.connect()
+        # Blocks are serialized across threads, which is what lets the
+        #   connection be shared (see check_same_thread below)
+        self._lock = threading.RLock()
+        # Connect on first use, so classes can be defined without a live database
+        #   (say, when their schema is cached)
+        self.connection = None    
+
+
+    def _open_connection(self):
+        # sqlite3 keeps compiled statements per connection, keyed by their text,
+        #   so let it hold as many as the statement cache does
+        return sqlite3.connect(self.config, 
+                               cached_statements=max(128, self._statement_cache_size or 0),
+                               check_same_thread=False)
+
+
+    def _ping(self, connection):
+        connection.execute('select 1')
+
+
+    def _end_transaction(self, connection, excType):
+        # Commit changes before closing (sqlite doesn't autocommit)
+        #   A generator closed early (GeneratorExit) isn't a failure.
+        if excType is None or excType is GeneratorExit:
+            connection.commit()
         else:
-            self.connection = None    
+            connection.rollback()
 
 
     def connect(self, forceReconnect=False):
@@ -42,21 +86,35 @@ class Sqlite_Connector(PlasticORM_Connection_Base):
             self.connection = None
 
         if self.connection is None:
-            self.connection = sqlite3.connect(self.config)
+            self.connection = self._open_connection()
 
 
     def __enter__(self):
-        self.connect()
+        self._lock.acquire()
+        try:
+            self.connect()
+        except:
+            self._lock.release()
+            raise
+        self._depth += 1
         return self
     
 
-    def __exit__(self, *args):
-        if not self.connection == None:
-            # Commit changes before closing (sqlite doesn't autocommit)
-            self.connection.commit()
-            if not self._keep_alive:
-                self.connection.close()
-                self.connection = None
+    def __exit__(self, excType, *args):
+        try:
+            # Only the outermost block ends the transaction, so nested
+            #   operations don't each commit (and fsync) the database file.
+            self._depth -= 1
+            if self._depth:
+                return
+            
+            if not self.connection == None:
+                self._end_transaction(self.connection, excType)
+                if not self._keep_alive:
+                    self.connection.close()
+                    self.connection = None
+        finally:
+            self._lock.release()
     
 
     # Override these depending on the DB engine
@@ -71,19 +129,60 @@ class Sqlite_Connector(PlasticORM_Connection_Base):
         return rs    
     
 
+    def _execute_query_iter(self, query, values, batchSize):
+        """Execute a query. Yields rows of data in RecordSets of up to batchSize records.
+        The block (and lock) is only held while each batch is read, so the connection
+          is free for other work (and threads) in between.
+        """
+        with self as plasticDB:
+            cursor = plasticDB.connection.cursor()
+            cursor.execute(query,values)
+        try:
+            if not cursor.description:
+                return
+            recordType = genRecordType(next(zip(*cursor.description)))
+            while True:
+                with self:
+                    rows = cursor.fetchmany(batchSize)
+                if not rows:
+                    break
+                yield RecordSet(initialData=rows, recordType=recordType)
+        finally:
+            with self:
+                cursor.close()
+    
+
     def _execute_insert(self, insertQuery, insertValues):
         """Execute an insert query. Returns an integer for the row inserted."""
         with self as plasticDB:
             cursor = plasticDB.connection.cursor()
             cursor.execute(insertQuery, insertValues)
             return cursor.lastrowid
+
+
+    def _execute_insert_many(self, insertQuery, insertValues, rowCount):
+        """Execute a multi-row insert query. Returns a list of the rows inserted."""
+        with self as plasticDB:
+            cursor = plasticDB.connection.cursor()
+            cursor.execute(insertQuery, insertValues)
+            # SQLite reports the last rowid, and rows from a single statement are sequential
+            return list(range(cursor.lastrowid - rowCount + 1, cursor.lastrowid + 1))
         
 
     def _execute_update(self, updateQuery, updateValues):
-        """Execute an updated query. Returns nothing."""
+        """Execute an updated query. Returns the number of rows changed."""
         with self as plasticDB:
             cursor = plasticDB.connection.cursor()
             cursor.execute(updateQuery, updateValues)
+            return cursor.rowcount
+
+
+    def _execute_update_many(self, updateQuery, updateRows):
+        """Execute an update query for each row of values. Returns the number of rows changed."""
+        with self as plasticDB:
+            cursor = plasticDB.connection.cursor()
+            cursor.executemany(updateQuery, updateRows)
+            return cursor.rowcount
 
 
     # SQLite retrieves these a bit differently...
@@ -109,9 +208,35 @@ class Sqlite_Connector(PlasticORM_Connection_Base):
         return RecordSet(initialData=cols, recordType=('COLUMN_NAME', 'IS_NULLABLE'))
 
 
+class Pooled_Sqlite_Connector(PooledConnection, Sqlite_Connector):
+    """Gives each thread its own SQLite connection.
+    NOTE: each connection to ':memory:' is its own database, so use a file!
+    """
+    _poolType = ThreadConnectionPool
+
+
+class Async_Sqlite_Connector(AsyncConnection, Sqlite_Connector):
+    """Runs the connection's work on one thread of its own, off the event loop.
+    SQLite only does one thing at a time anyway, and this way ':memory:' still works.
+    """
+    _async_workers = 1
+
+
 class PlasticSqlite(PlasticORM_Base):
     _connectionType = Sqlite_Connector
 
     _dbInfo = ':memory:'
 
-    pass
\ No newline at end of file
+    pass
+
+
+class PlasticPooledSqlite(PlasticSqlite):
+    _connectionType = Pooled_Sqlite_Connector
+
+    pass
+
+
+class PlasticAsyncSqlite(AsyncPlasticORM, PlasticSqlite):
+    _connectionType = Async_Sqlite_Connector
+
+    pass
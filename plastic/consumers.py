@@ -0,0 +1,124 @@
+"""Incremental consumers of RecordSets.
+
+Subscribed to a RecordSet, these are told about each group as it's appended
+  (or truncated away), so their results stay current without rescanning
+  every record.
+
+    total = RunningSum(recordSet, 'value')
+    recordSet.append(newRows)
+    total.value   # already includes newRows
+"""
+
+
+class RecordSetConsumer(object):
+    """Base for RecordSet subscribers. Subclasses override update,
+      and discard if they can take records back out.
+
+    If a column is given, only that column's values are consumed (nulls are skipped).
+      Otherwise the records themselves are.
+    """
+    def __init__(self, recordSet, column=None):
+        self._source = recordSet
+        self._index = None if column is None else recordSet._RecordType._lookup[column]
+        self.reset(recordSet)
+        recordSet.subscribe(self)
+
+
+    def _values(self, groups):
+        if self._index is None:
+            return (record for group in groups for record in group)
+        ix = self._index
+        return (record._tuple[ix]
+                for group in groups
+                for record in group
+                if record._tuple[ix] is not None)
+
+
+    def groupsAdded(self, recordSet, groups):
+        self.update(self._values(groups))
+
+
+    def groupsRemoved(self, recordSet, groups):
+        self.discard(self._values(groups))
+
+
+    def reset(self, recordSet):
+        """Start over from the whole RecordSet."""
+        self.clear()
+        self.update(self._values(recordSet._groups))
+
+
+    def clear(self):
+        raise NotImplementedError
+
+
+    def update(self, values):
+        raise NotImplementedError
+
+
+    def discard(self, values):
+        """By default, anything removed just means starting over."""
+        self.reset(self._source)
+
+
+    def close(self):
+        self._source.unsubscribe(self)
+
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.value)
+
+
+class RunningCount(RecordSetConsumer):
+    """The number of records (or non-null values in the column)."""
+    def clear(self):
+        self.value = 0
+
+
+    def update(self, values):
+        self.value += sum(1 for _ in values)
+
+
+    def discard(self, values):
+        self.value -= sum(1 for _ in values)
+
+
+class RunningSum(RecordSetConsumer):
+    def clear(self):
+        self.value = 0
+
+
+    def update(self, values):
+        self.value += sum(values)
+
+
+    def discard(self, values):
+        self.value -= sum(values)
+
+
+class RunningMin(RecordSetConsumer):
+    """The smallest value in the column, or None when there are none.
+    Only the removal of the current minimum forces a rescan.
+    """
+    _pick = staticmethod(min)
+
+
+    def clear(self):
+        self.value = None
+
+
+    def update(self, values):
+        values = list(values)
+        if values:
+            candidate = self._pick(values)
+            self.value = candidate if self.value is None else self._pick(self.value, candidate)
+
+
+    def discard(self, values):
+        if self.value is not None and self.value in values:
+            self.reset(self._source)
+
+
+class RunningMax(RunningMin):
+    """The largest value in the column, or None when there are none."""
+    _pick = staticmethod(max)
@@ -1,7 +1,11 @@
+import threading
+
 
 
 from .connection import PlasticORM_Connection_Base
 from .column import PlasticColumn
+from .cache import IdentityMap, TTLCache
+from .schema import SCHEMA_CACHE_MODES, getSchemaCache, schemaEntry, applySchemaEntry, warnSchemaChanged
 
 
 class MetaPlasticORM(type):
@@ -28,34 +32,173 @@ class MetaPlasticORM(type):
         # Derived classes get initialized, though.
         # Thus we can be sure to configure _before_ creating the derived classes
         else:
-            # Critically, the connection definition is deferred until here
-            if not cls._connection:
-                cls._connection = cls._connectionType(cls._dbInfo)
             cls._table = cls._table or clsname
             cls._table = cls._table.lower()
-            cls._verify_columns()
         cls._pending = []
+
+        # Each class gets its own identity map, if it opted in to one
+        if cls._identity_map_size or cls._identity_map_weak:
+            cls._identityMap = IdentityMap(cls._identity_map_size, cls._identity_map_weak)
+        else:
+            cls._identityMap = None
+
+        # ... and its own find() result cache, likewise
+        if cls._result_cache_size:
+            cls._resultCache = TTLCache(cls._result_cache_size, cls._result_cache_ttl)
+        else:
+            cls._resultCache = None
         
-        # Add the column names themselves as convenience attributes.
-        # These are of type PlasticColumn and allow some additional abstractions.
-        # NOTE: columns are not validated! They are assumed to not include
-        #   spaces or odd/illegal characters.
-        for ix,column in enumerate(cls._columns):
-            setattr(cls,column,PlasticColumn(cls, column))
+        # Lazy classes wait until they're first used to connect and configure
+        cls._configured = False
+        cls._configureLock = threading.RLock()
+        if not (cls._table and cls._lazy_configure):
+            cls._configure()
 
         # Continue and carry out the normal class definition process   
         return super(MetaPlasticORM,cls).__init__(clsname, bases, attributes)   
 
 
+    def _configure(cls):
+        """Connect and resolve the class's columns and keys. This only happens once.
+
+        Normally that's when the class is defined, but if _lazy_configure is set
+          it's put off until the class is first used (instantiated, queried, or 
+          a column attribute is referenced). 
+        """
+        if cls._configured:
+            return
+        
+        with cls._configureLock:
+            # Another thread may have beat us to it
+            if cls._configured:
+                return
+            
+            if cls._table:
+                # Critically, the connection definition is deferred until here
+                if not cls._connection:
+                    cls._connection = cls._connectionType(cls._dbInfo)
+                cls._verify_columns()
+        
+            # Add the column names themselves as convenience attributes.
+            # These are of type PlasticColumn and allow some additional abstractions.
+            # NOTE: columns are not validated! They are assumed to not include
+            #   spaces or odd/illegal characters.
+            for ix,column in enumerate(cls._columns):
+                setattr(cls,column,PlasticColumn(cls, column, cls._shadowedMethod(column)))
+
+            cls._build_hydrator()
+            
+            cls._configured = True
+
+
+    def _shadowedMethod(cls, column):
+        """The method (like count or find) the column's attribute would hide, if any."""
+        # Checked without getattr, since a miss would land in __getattr__ (and configure again)
+        if not any(column in klass.__dict__ for klass in cls.__mro__):
+            return None
+        existing = getattr(cls, column)
+        if isinstance(existing, PlasticColumn):
+            return existing._shadowed
+        return existing if callable(existing) else None
+
+
+    def __getattr__(cls, attribute):
+        """Only called when the attribute isn't found normally - like a column of
+          a lazy class that hasn't been configured yet.
+        """
+        if attribute.startswith('__') or cls.__dict__.get('_configured', True):
+            raise AttributeError("type object '%s' has no attribute '%s'" % (cls.__name__, attribute))
+        cls._configure()
+        return getattr(cls, attribute)
+
+
+    def __call__(cls, *args, **kwargs):
+        """Create an instance of the PlasticORM class.
+
+        If the class keeps an identity map and the key columns are given, then
+          the cached instance for that record is returned instead of a new one.
+          Like in __init__, any other values given are applied over it.
+        """
+        cls._configure()
+        
+        if cls._identityMap is None or kwargs.get('bypass_validation') or not cls._primary_key_cols:
+            return super(MetaPlasticORM,cls).__call__(*args, **kwargs)
+
+        values = dict((col,val) for col,val in zip(cls._columns,args))
+        values.update(kwargs)
+        
+        if not all(key in values for key in cls._primary_key_cols):
+            return super(MetaPlasticORM,cls).__call__(*args, **kwargs)
+        
+        instance = cls._identityMap.get(tuple(values[key] for key in cls._primary_key_cols))
+        if instance is None:
+            instance = super(MetaPlasticORM,cls).__call__(*args, **kwargs)
+            instance._cacheSelf()
+        else:
+            for column,value in values.items():
+                if getattr(instance, column) != value:
+                    setattr(instance, column, value)
+        return instance
+
+
+    def _build_hydrator(cls):
+        """Generate the class's _from_row, which makes an instance straight from a 
+          tuple of values in _columns order (or in the order of the columns given).
+
+        This skips __init__ and the __setattr__ bookkeeping entirely, since values
+          that came from the database have nothing pending to track.
+        """
+        columns = cls._columns
+        new = object.__new__
+        
+        def _from_row(row, columns=columns):
+            instance = new(cls)
+            instanceDict = instance.__dict__
+            instanceDict.update(zip(columns, row))
+            instanceDict['_pending'] = []
+            return instance
+        
+        cls._from_row = staticmethod(_from_row)
+
+
     def _verify_columns(cls):
         """Auto-configure the class definition. 
 
         As instances are created, they all follow the schema that is retrieved,
           so this only needs to be done once, so we perform it on class definition.
+
+        If the class has a _schema_cache file, then the configuration is loaded 
+          from there if possible (and saved there when it's not).
         """
+        needsKeys = cls._autoconfigure or not (cls._primary_key_cols and cls._primary_key_auto)
+        needsColumns = cls._autoconfigure or not cls._columns
+        if not (needsKeys or needsColumns):
+            return
+
+        schemaCache = getSchemaCache(cls._schema_cache) if cls._schema_cache else None
+        if schemaCache is not None:
+            if not cls._schema_cache_mode in SCHEMA_CACHE_MODES:
+                raise ValueError('Schema cache mode must be one of %r, not %r' % (SCHEMA_CACHE_MODES, cls._schema_cache_mode))
+            cached = schemaCache.get(cls._dbInfo, cls._schema, cls._table)
+            # _autoconfigure means always check with the engine
+            if cached and cls._schema_cache_mode == 'use' and not cls._autoconfigure:
+                applySchemaEntry(cls, cached)
+                return
+
+        cls._introspect(needsKeys, needsColumns)
+
+        if schemaCache is not None:
+            current = schemaEntry(cls)
+            if cached != current:
+                if cached and cls._schema_cache_mode == 'validate':
+                    warnSchemaChanged(cls, cached, current)
+                schemaCache.put(cls._dbInfo, cls._schema, cls._table, current)
+
 
+    def _introspect(cls, needsKeys, needsColumns):
+        """Query the engine for the class's key and column configuration."""
         # Auto-configure the key columns, if needed        
-        if cls._autoconfigure or not (cls._primary_key_cols and cls._primary_key_auto):
+        if needsKeys:
             with cls._connection as plasticDB:
                 # collect the PKs from the engine
                 pkCols = plasticDB.primaryKeys(cls._schema, cls._table)
@@ -63,7 +206,7 @@ class MetaPlasticORM(type):
                     cls._primary_key_cols, cls._primary_key_auto = zip(*(r._tuple for r in pkCols))    
         
         # Auto-configure the columns, if needed
-        if cls._autoconfigure or not cls._columns:
+        if needsColumns:
             with cls._connection as plasticDB:
                 # collect the columns from the engine
                 columns = plasticDB.columnConfig(cls._schema, cls._table)
@@ -0,0 +1,162 @@
+"""Run several fetches at once, on a pool of threads.
+
+Loading related tables (or the same table from several shards) one find() after
+  another takes the sum of their latencies. Fanned out, they take about as long
+  as the slowest one.
+
+    tasks, notes = fanOut([Fetch(Task.find, Task.active[1]),
+                           Fetch(Note.get_many, noteIDs)], timeout=5.0)
+
+Each worker does its own `with` block, so pooled connectors check out a connection
+  per thread. Fetches that would share one plain (unpooled) connection are run
+  one after another on the same worker instead, since they'd only wait on its lock.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .pool import PooledConnection
+from .recordset import RecordSet
+
+
+class Fetch(object):
+    """One call for fanOut: usually a Plastic class's find, find_records, or get_many,
+      along with the arguments to call it with.
+
+      Fetch(Task.find, Task.active[1], order_by=Task.id)
+    """
+    __slots__ = ('function', 'args', 'kwargs')
+
+
+    def __init__(self, function, *args, **kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+
+    def __call__(self):
+        return self.function(*self.args, **self.kwargs)
+
+
+    def _lane(self):
+        """Fetches with the same lane have to run one at a time. None is a lane of its own."""
+        cls = getattr(self.function, '__self__', None)
+        if not isinstance(getattr(cls, '_configured', None), bool):
+            return None
+        cls._configure()
+        if cls._connection is not None and not isinstance(cls._connection, PooledConnection):
+            return ('connection', id(cls._connection))
+        return None
+
+
+    def __repr__(self):
+        cls = getattr(self.function, '__self__', None)
+        if isinstance(cls, type):
+            name = '%s.%s' % (cls.__name__, self.function.__name__)
+        else:
+            name = getattr(self.function, '__qualname__', repr(self.function))
+        return 'Fetch(%s)' % ', '.join([name]
+                                       + [repr(arg) for arg in self.args]
+                                       + ['%s=%r' % item for item in sorted(self.kwargs.items())])
+
+
+class FanOutError(RuntimeError):
+    """Some of the fetches given to fanOut failed (or didn't finish in time).
+
+    errors maps the index of each failed fetch to its exception, and results
+      has what every fetch returned (None for the failures).
+    """
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+        super(FanOutError, self).__init__('%d of %d fetches failed: %s' % (
+            len(errors), len(results), '; '.join('[%d] %r' % (ix, errors[ix]) for ix in sorted(errors))))
+
+
+def fanOut(fetches, timeout=None, maxWorkers=None, errors='raise', executor=None):
+    """Run the fetches in parallel, returning their results in the same order.
+
+    Waits up to timeout seconds (overall) for them. Fetches not done by then count as
+      failed with a TimeoutError. (A query already running can't be stopped, though:
+      its worker finishes it and the result is thrown away.)
+
+    If any fail, errors='raise' raises a FanOutError once the rest are done,
+      with all the exceptions. Give errors='return' to get the exceptions in the results instead.
+
+    A thread pool is made for the call with up to maxWorkers threads (by default,
+      enough for all the fetches at once). Pass in an executor to reuse one instead.
+    """
+    if not errors in ('raise', 'return'):
+        raise ValueError("Errors policy must be 'raise' or 'return', not %r" % errors)
+    fetches = [fetch if isinstance(fetch, Fetch) else Fetch(fetch) for fetch in fetches]
+    if not fetches:
+        return []
+
+    lanes = OrderedDict()
+    for ix,fetch in enumerate(fetches):
+        lanes.setdefault(fetch._lane() or ('fetch', ix), []).append(ix)
+
+    # Workers only ever add to this, so it can be copied at the deadline
+    outcomes = {}
+    def runLane(ixs):
+        for ix in ixs:
+            try:
+                outcomes[ix] = (True, fetches[ix]())
+            except Exception as error:
+                outcomes[ix] = (False, error)
+
+    ownExecutor = executor is None
+    notDone = ()
+    if ownExecutor:
+        executor = ThreadPoolExecutor(max_workers=min(len(lanes), maxWorkers or len(lanes)),
+                                      thread_name_prefix='plastic-parallel')
+    try:
+        futures = [executor.submit(runLane, ixs) for ixs in lanes.values()]
+        _,notDone = wait(futures, timeout)
+        # Workers that are still going keep writing to outcomes, so only read this copy
+        finished = dict(outcomes)
+    finally:
+        if ownExecutor:
+            for future in notDone:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    results = [None]*len(fetches)
+    failures = {}
+    for ix in range(len(fetches)):
+        if not ix in finished:
+            finished[ix] = (False, TimeoutError('%r was not done within %r seconds' % (fetches[ix], timeout)))
+        succeeded,result = finished[ix]
+        if succeeded:
+            results[ix] = result
+        else:
+            failures[ix] = result
+            if errors == 'return':
+                results[ix] = failures[ix]
+
+    if failures and errors == 'raise':
+        raise FanOutError(failures, results)
+    return results
+
+
+def fanOutRecords(fetches, timeout=None, maxWorkers=None, executor=None):
+    """Run fetches that return RecordSets (like find_records) in parallel,
+      and merge them into one RecordSet, with a group for each fetch (in order).
+    They all need the same columns. Any failure raises a FanOutError.
+    """
+    fetches = list(fetches)
+    if not fetches:
+        raise ValueError('At least one fetch is needed to know the columns to merge')
+    results = fanOut(fetches, timeout=timeout, maxWorkers=maxWorkers, executor=executor)
+
+    merged = None
+    for fetch,result in zip(fetches, results):
+        if not isinstance(result, RecordSet):
+            raise ValueError('Only fetches that return RecordSets can be merged, not %r' % fetch)
+        if merged is None:
+            merged = RecordSet(recordType=result._RecordType)
+        # Each fetch is one group, even if the engine returned it in several
+        if len(result) == 1:
+            merged.extend(result)
+        else:
+            merged.append(list(result.records))
+    return merged
@@ -2,8 +2,10 @@ import functools
 
 
 from .metaplastic import MetaPlasticORM
-from .connection import PlasticORM_Connection_Base
-from .column import PlasticColumn
+from .connection import PlasticORM_Connection_Base, AGGREGATE_FUNCTIONS
+from .column import PlasticColumn, DeferredColumns, SortOrder
+from .cache import invalidateAll
+from .recordset import RecordSet
 
             
 class PlasticORM_Base(object, metaclass=MetaPlasticORM):
@@ -26,10 +28,20 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
     # Set _autocommit to True to have changes to the instaces immediately applied
     _autocommit = False
     
+    # Set _lazy_configure to True to put off connecting and configuring the class
+    #   until it's first used (so defining many classes that may not be used is cheap)
+    _lazy_configure = False
+    
     # Set _autoconfigure to True to force the class to reconfigure every time
     # NOTE: if there are no columns or PKs defined, auto-configure runs regardless
     _autoconfigure = False
 
+    # Set _schema_cache to a file path to save the auto-configured schema there,
+    #   and load it from there next time instead of querying for it. 
+    # See plastic.schema for the _schema_cache_mode options.
+    _schema_cache = None
+    _schema_cache_mode = 'use'
+
     # Configure these to avoid auto-configure overhead
     _columns = tuple()
     _primary_key_cols = tuple()
@@ -44,6 +56,24 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
     
     # Holding list for queuing the changes that need to be applied
     _pending = []
+
+    # The columns a find() left out, if any (see DeferredColumns)
+    _deferred = None
+
+    # Set _identity_map_size to keep up to that many instances cached by their 
+    #   primary key, so the same record isn't retrieved (or built) again and again.
+    # Set _identity_map_weak to True to instead keep them only while referenced elsewhere.
+    _identity_map_size = 0
+    _identity_map_weak = False
+    _identityMap = None
+    _identityKey = None
+
+    # Set _result_cache_size to cache up to that many find() results, keyed on the
+    #   query and its values, for _result_cache_ttl seconds (None to never expire).
+    # Writes made through Plastic to the table clear its cached results.
+    _result_cache_size = 0
+    _result_cache_ttl = None
+    _resultCache = None
     
 
     def _delayAutocommit(function):
@@ -101,9 +131,14 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
     def __setattr__(self, attribute, value):
         """Do the autocommit bookkeeping, if needed"""
         # Set columns as pending changes
-        currentValue = getattr(self, attribute)
-        if attribute in self._columns and currentValue != value:            
+        deferred = self.__dict__.get('_deferred')
+        if deferred is not None and attribute in deferred.columns and not attribute in self.__dict__:
+            # No sense loading a column just to overwrite it
             self._pending.append(attribute)
+        else:
+            currentValue = getattr(self, attribute)
+            if attribute in self._columns and currentValue != value:            
+                self._pending.append(attribute)
         
         super(PlasticORM_Base,self).__setattr__(attribute, value)
         
@@ -137,9 +172,24 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
         return set(self._columns).difference(self._primary_key_cols)
 
 
+    @property
+    def _keyValues(self):
+        """Helper function for getting the PK values, in order"""
+        return tuple(getattr(self, pkcol) for pkcol in self._primary_key_cols)
+
+
+    @property
+    def _unboundKeyColumns(self):
+        """Helper function for getting the PK columns that have no value yet"""
+        return set(pkcol
+                   for pkcol
+                   in self._primary_key_cols
+                   if getattr(self, pkcol) is None 
+                   or isinstance(getattr(self, pkcol), PlasticColumn))
+
+
     @classmethod
-    @_delayAutocommit
-    def find(cls, *filters):
+    def find(cls, *filters, columns=None, order_by=None, limit=None, offset=None):
         """Return a list of instances for all the records that match the filters.
 
         The filters args is most easily generated as a sequence of PlasticColumn slices.
@@ -164,33 +214,551 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
 
         NOTE: The slicing is NOT exactly the same semantically to normal list slicing.
           This is to simplify and be easier to analogue to SQL
+
+        To only select some of the columns, name them in columns (the keys are always included).
+          The rest are deferred: reading one on any of the instances loads it for all of them.
+            Table.find(Table.ID[4:], columns=('Title',))
+
+        Results can be sorted with order_by, given one or more columns. Mark descending 
+          columns with .desc (or negate them), and cut the results down with limit and offset:
+            Table.find(Table.Column3['asdf'], order_by=(-Table.ID, Table.Title), limit=10)
+          To page deeply, find_after (or find_pages) is faster than large offsets.
         """
-        # Split out the filter strings to use in the where clause
-        #   and the values that are needed to be passed in as parameters
-        filters,values = zip(*filters)
-        values = [value 
-                  for conditionValues in values
-                  for value in conditionValues]
+        cls._configure()
+        selected = cls._projection(columns)
+
+        with cls._connection as plasticDB:
+            recordsQuery, values = cls._filterQuery(plasticDB, filters, selected,
+                                                    cls._orderSpec(order_by), limit, offset)
+            records = cls._cachedQuery(plasticDB, recordsQuery, values)
         
+        return cls._hydrate(records, selected)
+
+
+    @classmethod
+    def find_records(cls, *filters, columns=None, order_by=None, limit=None, offset=None):
+        """Like find, but return the RecordSet of the matching records instead of instances.
+        Only the columns asked for (and the keys) are in the records.
+        """
+        cls._configure()
+        selected = cls._projection(columns)
+
         with cls._connection as plasticDB:
-            # Build the query string (as defined by the engine configured)
+            recordsQuery, values = cls._filterQuery(plasticDB, filters, selected,
+                                                    cls._orderSpec(order_by), limit, offset)
+            return cls._ownRecords(cls._cachedQuery(plasticDB, recordsQuery, values))
+
+
+    @classmethod
+    def find_after(cls, *filters, after=None, order_by=None, limit=100, columns=None):
+        """Return the next limit instances sorted after the given page key, using keyset (seek)
+          pagination. Unlike an offset, the engine doesn't have to skip over the earlier records,
+          so every page costs about the same.
+
+        The order is order_by followed by the primary keys, so the page key is unique.
+          The key for a page is the sort values of its last instance: see page_key.
+          Start with after=None for the first page.
+        NOTE: the sort columns shouldn't be nullable, since nulls can't be sought past.
+        """
+        cls._configure()
+        order = cls._keysetOrder(order_by)
+        if after is not None:
+            filters += (cls._seekFilter(order, after),)
+        if columns is not None:
+            columns = set(columns).union(column for column,_ in order)
+        return cls.find(*filters, columns=columns, order_by=order, limit=limit)
+
+
+    @classmethod
+    def find_pages(cls, *filters, order_by=None, page_size=100, columns=None):
+        """Yield the instances matching the filters a page (list) at a time, by keyset pagination."""
+        after = None
+        while True:
+            page = cls.find_after(*filters, after=after, order_by=order_by, limit=page_size, columns=columns)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = cls.page_key(page[-1], order_by)
+
+
+    @classmethod
+    def page_key(cls, instance, order_by=None):
+        """The sort values of the instance, for find_after to continue from."""
+        return tuple(getattr(instance, column) for column,_ in cls._keysetOrder(order_by))
+
+
+    @classmethod
+    def _orderSpec(cls, order_by):
+        """Normalize order_by into a tuple of (column, descending) pairs.
+        Columns may be PlasticColumns, their .asc/.desc, names (prefixed with '-' for descending),
+          or pairs already like these.
+        """
+        if order_by is None:
+            return ()
+        if isinstance(order_by, (PlasticColumn, SortOrder, str)):
+            order_by = (order_by,)
+        
+        order = []
+        for sortBy in order_by:
+            if isinstance(sortBy, SortOrder):
+                column,descending = sortBy.column._column, sortBy.descending
+            elif isinstance(sortBy, PlasticColumn):
+                column,descending = sortBy._column, False
+            elif isinstance(sortBy, tuple):
+                column,descending = sortBy
+            elif sortBy.startswith('-'):
+                column,descending = sortBy[1:], True
+            else:
+                column,descending = sortBy, False
+            
+            if not column in cls._columns:
+                raise ValueError('Can not sort by %r: no such column in %s.%s' % (column, cls._schema, cls._table))
+            order.append((column, bool(descending)))
+        return tuple(order)
+
+
+    @classmethod
+    def _keysetOrder(cls, order_by):
+        """The order_by with the primary keys added, so every record's place is unique."""
+        order = cls._orderSpec(order_by)
+        sortColumns = set(column for column,_ in order)
+        order += tuple((key, False) for key in cls._primary_key_cols if not key in sortColumns)
+        if not order:
+            raise ValueError('Can not page through %s.%s: no primary key columns or order_by given' % (cls._schema, cls._table))
+        return order
+
+
+    @classmethod
+    def _seekFilter(cls, order, after):
+        """Make the filter for the records sorted after the key's values. For (a, b) that's
+          (a > ?) or (a = ? and b > ?), with the inequalities flipped for descending columns.
+        """
+        if len(after) != len(order):
+            raise ValueError('Page key %r does not match the %d sort columns' % (after, len(order)))
+        
+        clauses = []
+        values = []
+        for ix,(column,descending) in enumerate(order):
+            conditions = []
+            for equalColumn,value in zip(order[:ix], after):
+                condition, conditionValues = getattr(cls, equalColumn[0])[[value]]
+                conditions.append(condition)
+                values.extend(conditionValues)
+            
+            if descending:
+                condition, conditionValues = getattr(cls, column)[:after[ix]]
+            else:
+                condition, conditionValues = getattr(cls, column)[after[ix]:]
+            conditions.append(condition)
+            values.extend(conditionValues)
+            
+            clauses.append('(%s)' % ' and '.join(conditions))
+        
+        return ' (%s) ' % ' or '.join(clauses), tuple(values)
+
+
+    @classmethod
+    def count(cls, *filters):
+        """Return the number of records matching the filters, counted by the engine."""
+        return cls._aggregate((('count', 'count', None),), filters)[0]['count']
+
+
+    @classmethod
+    def exists(cls, *filters):
+        """Return True if any record matches the filters."""
+        cls._configure()
+
+        with cls._connection as plasticDB:
+            conditions,values = cls._splitFilters(filters)
+            
+            def build():
+                existsQuery = plasticDB._get_query_template('exists')
+                return existsQuery % (cls._table, '\n\t and '.join(conditions))
+            
+            existsQuery = plasticDB._cached_statement(('exists', cls._table, conditions), build)
+            return bool(cls._cachedQuery(plasticDB, existsQuery, values)[0]['found'])
+
+
+    @classmethod
+    def sum(cls, column, *filters):
+        """Return the total of the column over the records matching the filters (None if there are none)."""
+        return cls._aggregate((('total', 'sum', column),), filters)[0]['total']
+
+
+    @classmethod
+    def min(cls, column, *filters):
+        """Return the smallest value of the column in the records matching the filters."""
+        return cls._aggregate((('least', 'min', column),), filters)[0]['least']
+
+
+    @classmethod
+    def max(cls, column, *filters):
+        """Return the largest value of the column in the records matching the filters."""
+        return cls._aggregate((('greatest', 'max', column),), filters)[0]['greatest']
+
+
+    @classmethod
+    def group_by(cls, columns, *filters, **aggregates):
+        """Return a RecordSet with a record for each distinct value of the columns
+          (in the records matching the filters), sorted by them.
+        
+        Each keyword names an aggregate to include, given as the function name 
+          ('count', 'sum', 'min', 'max', or 'avg') and the column it applies to.
+          A bare 'count' counts the records. Without any, the records are counted as 'count'.
+            Task.group_by(Task.active, tasks='count', newest=('max', Task.id))
+        """
+        if isinstance(columns, (PlasticColumn, str)):
+            columns = (columns,)
+        groupColumns = tuple(cls._columnName(column) for column in columns)
+        
+        if not aggregates:
+            aggregates = {'count': 'count'}
+        
+        selections = []
+        for alias,aggregate in sorted(aggregates.items()):
+            if isinstance(aggregate, str):
+                function,column = aggregate, None
+            else:
+                function,column = aggregate
+            selections.append((alias, function, column))
+        
+        return cls._ownRecords(cls._aggregate(tuple(selections), filters, groupColumns))
+
+
+    @classmethod
+    def _columnName(cls, column):
+        if isinstance(column, PlasticColumn):
+            column = column._column
+        if not column in cls._columns:
+            raise ValueError('No such column in %s.%s: %r' % (cls._schema, cls._table, column))
+        return column
+
+
+    @classmethod
+    def _aggregate(cls, selections, filters, groupColumns=()):
+        """Run the aggregate selections (alias, function, column) over the records
+          matching the filters, grouped by the groupColumns (if any). Returns the RecordSet.
+        """
+        cls._configure()
+        
+        aggregates = []
+        for alias,function,column in selections:
+            if not function in AGGREGATE_FUNCTIONS:
+                raise ValueError('Aggregate function must be one of %r, not %r' % (AGGREGATE_FUNCTIONS, function))
+            if column is None and function != 'count':
+                raise ValueError('The %s aggregate needs a column' % function)
+            aggregates.append((alias, function, None if column is None else cls._columnName(column)))
+        aggregates = tuple(aggregates)
+
+        with cls._connection as plasticDB:
+            conditions,values = cls._splitFilters(filters)
+            
+            def build():
+                fields = list(groupColumns)
+                for alias,function,column in aggregates:
+                    if column is None:
+                        fields.append('%s as %s' % (plasticDB._get_query_template('count_all'), alias))
+                    else:
+                        fields.append('%s as %s' % (plasticDB._get_query_template(function) % column, alias))
+                
+                aggregateQuery = plasticDB._get_query_template('aggregate') % (
+                    ', '.join(fields),
+                    cls._table,
+                    '\n\t and '.join(conditions))
+                if groupColumns:
+                    aggregateQuery += plasticDB._get_query_template('group_by') % ', '.join(groupColumns)
+                    aggregateQuery += plasticDB._get_query_template('order_by') % ', '.join(
+                                        plasticDB._get_query_template('order_asc') % column
+                                        for column
+                                        in groupColumns)
+                return aggregateQuery
+            
+            aggregateQuery = plasticDB._cached_statement(('aggregate', cls._table, aggregates, groupColumns, conditions), build)
+            return cls._cachedQuery(plasticDB, aggregateQuery, values)
+
+
+    @classmethod
+    def _cachedQuery(cls, plasticDB, query, values):
+        """Run the query, unless the result cache (if any) still has its records.
+        The records are cached rather than instances, so each caller gets their own.
+        """
+        if cls._resultCache is None:
+            return plasticDB.query(query, values)
+        
+        key = (query, tuple(values))
+        try:
+            records = cls._resultCache.get(key)
+        except TypeError: # unhashable values can't be cached
+            return plasticDB.query(query, values)
+        
+        if records is None:
+            # If a write invalidates the table while this runs, the result may be stale: don't keep it
+            generation = cls._resultCache.generation
+            records = plasticDB.query(query, values)
+            cls._resultCache.put(key, records, tags=(cls._resultTag(),), generation=generation)
+        return records
+
+
+    @classmethod
+    def _ownRecords(cls, records):
+        """Cached records are shared, so a RecordSet handed back to the caller 
+          (who may append to it, index it, ...) has to be their own copy.
+        """
+        if cls._resultCache is None:
+            return records
+        # Built up rather than copied, since an empty RecordSet isn't enough to copy from
+        copy = RecordSet(recordType=records._RecordType)
+        copy.extend(records)
+        return copy
+
+
+    @classmethod
+    def _resultTag(cls):
+        return ('table', cls._schema, cls._table)
+
+
+    @classmethod
+    def _invalidateResults(cls):
+        """Drop the cached find() results for the table, for every class that caches them."""
+        invalidateAll(cls._resultTag())
+
+
+    @classmethod
+    def find_iter(cls, *filters, batch_size=1000, batches=False, columns=None, order_by=None, limit=None, offset=None):
+        """Yield instances for all the records that match the filters, 
+          without holding the whole result in memory.
+
+        Records are streamed from the engine batch_size at a time, on a 
+          server-side cursor where the engine has one. 
+          Set batches to True to get each batch as a list of instances instead.
+        
+        The rest of the arguments are the same as for find. If no filters are given, every record is walked.
+          Deferred columns are loaded a batch at a time.
+
+        Outside of a `with` block, MySQL streams the records over a connection of their own, so the
+          class's connection stays free between batches. (Inside one, the block's connection is used.)
+          SQLite streams on the shared connection, only holding it while each batch is read,
+          since a second connection's open read would keep writers out of the database.
+          Close the iterator (or finish it) to let the streaming cursor (and connection) go.
+        """
+        cls._configure()
+        selected = cls._projection(columns)
+
+        plasticDB = cls._connection
+        recordsQuery, values = cls._filterQuery(plasticDB, filters, selected,
+                                                cls._orderSpec(order_by), limit, offset)
+        for records in plasticDB.queryIter(recordsQuery, values, batch_size):
+            objects = cls._hydrate(records, selected)
+            if batches:
+                yield objects
+            else:
+                for instance in objects:
+                    yield instance
+
+
+    @classmethod
+    def _projection(cls, columns):
+        """The columns to select, in _columns order: those asked for plus the keys (or all of them)."""
+        if columns is None:
+            return cls._columns
+        if isinstance(columns, str):
+            columns = (columns,)
+        
+        unknown = set(columns).difference(cls._columns)
+        if unknown:
+            raise ValueError('No such columns in %s.%s: %s' % (cls._schema, cls._table, ', '.join(sorted(unknown))))
+        if not cls._primary_key_cols and set(cls._columns).difference(columns):
+            raise ValueError('Can not defer columns of %s.%s: no primary key columns to load them by' % (cls._schema, cls._table))
+        
+        wanted = set(columns).union(cls._primary_key_cols)
+        return tuple(column for column in cls._columns if column in wanted)
+
+
+    @staticmethod
+    def _splitFilters(filters):
+        """Split out the filter strings to use in the where clause
+          and the values that are needed to be passed in as parameters.
+        """
+        if filters:
+            conditions,values = zip(*filters)
+            values = [value 
+                      for conditionValues in values
+                      for value in conditionValues]
+        else:
+            conditions,values = (' (1=1) ',), []
+        return conditions, values
+
+
+    @classmethod
+    def _filterQuery(cls, plasticDB, filters, columns=None, order=(), limit=None, offset=None):
+        """Build the query (and its parameter values) for the records matching the filters.
+        The order is as made by _orderSpec.
+        """
+        columns = columns or cls._columns
+        conditions,values = cls._splitFilters(filters)
+        
+        # Limit and offset are parameters too, so the statement only depends on which are given
+        if limit is not None and offset is not None:
+            paging = 'limit_offset'
+            values += [limit, offset]
+        elif limit is not None:
+            paging = 'limit'
+            values += [limit]
+        elif offset is not None:
+            paging = 'offset'
+            values += [offset]
+        else:
+            paging = None
+        
+        # Build the query string (as defined by the engine configured)
+        def build():
             recordsQuery = plasticDB._get_query_template('basic_filtered')
-            recordsQuery %= (
-                ','.join(cls._columns),
+            recordsQuery = recordsQuery % (
+                ','.join(columns),
                 cls._table,
-                '\n\t and '.join(condition for condition in filters)
+                '\n\t and '.join(condition for condition in conditions)
                 )
-            
-            records = plasticDB.query(recordsQuery, values)
+            if order:
+                directions = (plasticDB._get_query_template('order_asc'),
+                              plasticDB._get_query_template('order_desc'))
+                recordsQuery += plasticDB._get_query_template('order_by') % ', '.join(
+                                    directions[descending] % getattr(cls, column).fqn
+                                    for column,descending
+                                    in order)
+            if paging:
+                recordsQuery += plasticDB._get_query_template(paging)
+            return recordsQuery
         
-        # Render the results into a list 
+        recordsQuery = plasticDB._cached_statement(('basic_filtered', cls._table, columns, conditions, order, paging), build)
+        return recordsQuery, values
+
+
+    @classmethod
+    def _hydrate(cls, records, columns=None):
+        """Render the records into a list of instances.
+        The records' columns must be in _columns order (or the order of the columns given),
+          so they can be used as-is. Any other columns are deferred.
+        """
+        columns = columns or cls._columns
+        fromRow = cls._from_row
+        deferred = None
+        if len(columns) < len(cls._columns):
+            deferred = DeferredColumns(cls, set(cls._columns).difference(columns))
+        
+        if cls._identityMap is None:
+            if deferred is None:
+                return [fromRow(record._tuple) for record in records]
+            objects = [fromRow(record._tuple, columns) for record in records]
+            for instance in objects:
+                deferred.add(instance)
+            return objects
+        
+        # Reuse the instance already made for the record, if there is one
+        keyIxs = [columns.index(key) for key in cls._primary_key_cols]
         objects = []
         for record in records:
-            initDict = record._asdict()
-            initDict['bypass_validation'] = True
-            objects.append(cls(**initDict))
+            row = record._tuple
+            instance = cls._identityMap.get(tuple(row[ix] for ix in keyIxs))
+            if instance is None:
+                instance = fromRow(row, columns)
+                if deferred is not None:
+                    deferred.add(instance)
+                instance._cacheSelf()
+            else:
+                instance._refresh(dict(zip(columns, row)))
+            objects.append(instance)
 
         return objects
+
+
+    @classmethod
+    def get_many(cls, keys, missing='skip'):
+        """Return the instances for each of the primary key values given, in the same order.
+
+        Rather than a query per key, the keys are queried in chunks of IN filters,
+          each kept under the engine's parameter limit.
+          For compound primary keys give each key as a tuple in _primary_key_cols order.
+
+        Keys that aren't found are handled by the missing policy:
+          'skip' leaves them out, 'none' puts None in their place, and 'raise' throws a KeyError.
+        """
+        cls._configure()
+
+        if not missing in ('skip', 'none', 'raise'):
+            raise ValueError("Missing policy must be 'skip', 'none', or 'raise', not %r" % missing)
+        if not cls._primary_key_cols:
+            raise ValueError('Can not get records by key for %s.%s: no primary key columns' % (cls._schema, cls._table))
+
+        keys = [key if isinstance(key, tuple) else (key,) for key in keys]
+        
+        found = {}
+        if cls._identityMap is not None:
+            for key in keys:
+                instance = cls._identityMap.get(key)
+                if instance is not None:
+                    found[key] = instance
+        
+        # Only query each key once, and only if we need to
+        remaining = []
+        for key in keys:
+            if not key in found:
+                found[key] = None
+                remaining.append(key)
+        
+        chunkSize = max(1, cls._connection._max_params // len(cls._primary_key_cols))
+        for start in range(0, len(remaining), chunkSize):
+            for instance in cls.find(cls._keyFilter(remaining[start:start+chunkSize])):
+                found[instance._keyValues] = instance
+
+        if missing == 'raise':
+            missingKeys = [key for key in keys if found[key] is None]
+            if missingKeys:
+                raise KeyError('Records not found in %s.%s for keys: %s' % (
+                                 cls._schema, cls._table, ', '.join(repr(key) for key in missingKeys)))
+        
+        if missing == 'skip':
+            return [found[key] for key in keys if found[key] is not None]
+        else:
+            return [found[key] for key in keys]
+
+
+    @classmethod
+    def _keyFilter(cls, keys):
+        """Make a filter that selects the records for the primary key tuples given."""
+        # Single columns can simply use the PlasticColumn's IN filter
+        if len(cls._primary_key_cols) == 1:
+            return getattr(cls, cls._primary_key_cols[0])[tuple(key[0] for key in keys)]
+        
+        # Compound keys use row values instead
+        keyColumns = ','.join(getattr(cls, column).fqn for column in cls._primary_key_cols)
+        rowTemplate = '(%s)' % ','.join(['PARAM_TOKEN']*len(cls._primary_key_cols))
+        return (' ((%s) in (%s)) ' % (keyColumns, ','.join([rowTemplate]*len(keys))),
+                tuple(value for key in keys for value in key))
+
+
+    def _refresh(self, values):
+        """Apply values retrieved from the database, without disturbing pending changes"""
+        for column,value in values.items():
+            if not column in self._pending:
+                super(PlasticORM_Base,self).__setattr__(column, value)
+
+
+    def _cacheSelf(self):
+        """Make the identity map (if any) point to this instance for its record.
+        Any other instance cached for the same key is stale after a write, so it's replaced.
+        """
+        if self._identityMap is None or not self._primary_key_cols or self._unboundKeyColumns:
+            return
+        
+        key = self._keyValues
+        # If the key changed, the old entry no longer describes this instance
+        if self._identityKey is not None and self._identityKey != key:
+            if self._identityMap.peek(self._identityKey) is self:
+                self._identityMap.discard(self._identityKey)
+        
+        self._identityMap.put(key, self)
+        super(PlasticORM_Base,self).__setattr__('_identityKey', key)
         
         
     @_delayAutocommit
@@ -216,18 +784,32 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
                                       in keyDict 
                                       if keyDict[key] is None))
         
+        # Copy from the instance already cached for the record, unless it's this one
+        #   (in which case we really do want to refresh) or it has unsaved changes.
+        if self._identityMap is not None:
+            cached = self._identityMap.get(tuple(keyDict[key] for key in self._primary_key_cols))
+            if not (cached is None or cached is self or cached._pending):
+                for column in self._columns:
+                    super(PlasticORM_Base,self).__setattr__(column, getattr(cached, column))
+                self._pending = []
+                self._cacheSelf()
+                return
+        
         # Query for associated record
         with self._connection as plasticDB:
             
             keyColumns,keyValues = zip(*sorted(keyDict.items()))
 
-            recordQuery = plasticDB._get_query_template('basic_filtered')
-            recordQuery %= (
-                ','.join(sorted(self._nonKeyColumns)),
-                self._table,
-                ','.join('%s = PARAM_TOKEN' % keyColumn 
-                         for keyColumn 
-                         in sorted(keyColumns)))
+            def build():
+                recordQuery = plasticDB._get_query_template('basic_filtered')
+                return recordQuery % (
+                    ','.join(sorted(self._nonKeyColumns)),
+                    self._table,
+                    '\n\t and '.join('%s = PARAM_TOKEN' % keyColumn 
+                                     for keyColumn 
+                                     in sorted(keyColumns)))
+            
+            recordQuery = plasticDB._cached_statement(('retrieve', self._table, self._columns, keyColumns), build)
 
             entry = plasticDB.queryOne(recordQuery, keyValues)
 
@@ -240,6 +822,7 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
 
         # Clear the pending buffer, since we just retrieved    
         self._pending = []
+        self._cacheSelf()
 
     
     def _insert(self):
@@ -269,19 +852,82 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
             # they're already iterables, so I'm just going to hit it with zip
             for column in self._autoKeyColumns:
                 setattr(self,column,rowID)
+        self._invalidateResults()
         
         # Clear the pending buffer, since we just sync'd
         self._pending = []
+        self._cacheSelf()
+
+
+    @classmethod
+    def bulk_insert(cls, entries):
+        """Insert many new records at once. Returns the list of instances inserted.
+
+        Entries may be instances or dicts of column values. They are grouped by
+          the set of columns given, and each group is sent to the engine as 
+          chunked multi-row inserts, all in one transaction.
+        The autoincrement key columns are filled in on every instance, and the
+          instances are returned in the same order as the entries.
+
+        Columns left out of an entry are left to the database (for its defaults).
+          If it rejects any entry, nothing is inserted. Entries missing non-autoincrement
+          key values raise a ValueError up front.
+        """
+        cls._configure()
+
+        # Group the entries by the columns they'll insert
+        batches = {}
+        objects = []
+        for ix,entry in enumerate(entries):
+            if isinstance(entry, dict):
+                values = entry
+                entry = cls(bypass_validation=True, **values)
+                # Set directly, so an autocommitting class doesn't write it on its own first
+                super(PlasticORM_Base,entry).__setattr__('_pending', list(values))
+            
+            missingKeys = entry._nonAutoKeyColumns.difference(entry._pending)
+            if missingKeys:
+                raise ValueError('Can not insert entry %d into %s.%s without key values for: %s' % (
+                                    ix, cls._schema, cls._table, ', '.join(sorted(missingKeys))))
+            
+            columns = tuple(sorted(set(entry._pending).difference(entry._autoKeyColumns)))
+            if not columns:
+                raise ValueError('Can not insert entry %d into %s.%s: no column values given' % (ix, cls._schema, cls._table))
+            batches.setdefault(columns, []).append(entry)
+            objects.append(entry)
+
+        with cls._connection as plasticDB:
+            for columns,batch in batches.items():
+                rows = [[getattr(entry,column) for column in columns]
+                        for entry
+                        in batch]
+                rowIDs = plasticDB.insertMany(cls._table, columns, rows)
+                
+                for entry,rowID in zip(batch, rowIDs):
+                    for column in entry._autoKeyColumns:
+                        super(PlasticORM_Base,entry).__setattr__(column, rowID)
+                    entry._pending = []
+                    entry._cacheSelf()
+        
+        if objects:
+            cls._invalidateResults()
+        return objects
+
+    insert_many = bulk_insert
         
         
+    def _verifyNotNull(self):
+        """Don't update a column to null when it shouldn't be"""
+        for column in set(self._not_nullable_cols).intersection(self._pending):
+            if getattr(self, column) is None:
+                raise ValueError('Can not null column %s in table %s.%s' % (column, self._schema, self._table))
+
+
     def _update(self):
         """Update the current object's record with the changed (pending) values.
         This will also do some minor validation to make sure it's compliant.
         """
-        # Don't update a column to null when it shouldn't be
-        for column in set(self._not_nullable_cols).intersection(self._pending):
-            if getattr(self, column) is None:
-                raise ValueError('Can not null column %s in table %s.%s' % (column, self._schema, self._table))
+        self._verifyNotNull()
 
         setValues = dict((column,getattr(self,column))
                       for column 
@@ -294,9 +940,11 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
         # Delegate the update to the engine and apply
         with self._connection as plasticDB:            
             plasticDB.update(self._table, setValues, keyValues)
+        self._invalidateResults()
         
         # Clear the pending buffer, since we just sync'd
         self._pending = []
+        self._cacheSelf()
 
         
     def _upsert(self):
@@ -317,6 +965,17 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
         for pkColumn in self._primary_key_cols:
             pkValues[pkColumn] = values.get(pkColumn, getattr(self,pkColumn))
         
+        # Let the engine decide in one statement, if it can and the values would do as an insert
+        if self._connection.supportsUpsert:
+            upsertValues = dict(values)
+            upsertValues.update(pkValues)
+            keysSet = not any(value is None or isinstance(value, PlasticColumn)
+                              for value
+                              in pkValues.values())
+            if keysSet and not set(self._not_nullable_cols).difference(upsertValues):
+                self._nativeUpsert(upsertValues)
+                return
+        
         # Check if the keys are given, if so get all the values for that record
         
         # We need to do a specialized delay autocommit so we can safely attempt this.
@@ -349,6 +1008,148 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
             super(PlasticORM_Base,self).__setattr__('_autocommit', bufferAutocommit)
 
         
+    def _nativeUpsert(self, values):
+        """Write the values with the engine's single statement upsert."""
+        columns = sorted(values)
+        with self._connection as plasticDB:
+            plasticDB.upsert(self._table, columns, [values[column] for column in columns], self._primary_key_cols)
+        self._invalidateResults()
+        
+        self._pending = []
+        # Make sure no stale instance is cached for the record we just wrote
+        self._cacheSelf()
+        
+        # Any column we didn't write may still hold the last record's value, so pull them fresh
+        if set(self._columns).difference(values):
+            self._retrieveSelf()
+
+
+    @classmethod
+    def upsert_many(cls, entries):
+        """Insert or update many records at once, keyed on their primary keys.
+
+        Entries may be dicts of column values or instances. Instances write all the
+          columns they have values for, so they're synced to the database as they are.
+        Every entry needs its key values. Entries are grouped by their set of columns
+          and sent as chunked multi-row upserts where the engine has them.
+          Otherwise each is upserted one by one (still in one transaction).
+        
+        Returns the number of entries written.
+        """
+        cls._configure()
+
+        batches = {}
+        for entry in entries:
+            if isinstance(entry, dict):
+                values = entry
+            else:
+                values = dict((column, getattr(entry, column))
+                              for column
+                              in cls._columns
+                              if not isinstance(getattr(entry, column), PlasticColumn))
+            
+            missingKeys = set(cls._primary_key_cols).difference(values)
+            if missingKeys:
+                raise ValueError('Can not upsert into %s.%s without key values for: %s' % (
+                                    cls._schema, cls._table, ', '.join(sorted(missingKeys))))
+            
+            columns = tuple(sorted(values))
+            batches.setdefault(columns, []).append((entry, values))
+
+        count = 0
+        with cls._connection as plasticDB:
+            for columns,batch in batches.items():
+                if plasticDB.supportsUpsert:
+                    rows = [[values[column] for column in columns] for _,values in batch]
+                    plasticDB.upsertMany(cls._table, columns, rows, cls._primary_key_cols)
+                    for entry,values in batch:
+                        if not isinstance(entry, dict):
+                            entry._pending = []
+                            entry._cacheSelf()
+                        # No instance was written for a dict, so any cached one is now stale
+                        elif cls._identityMap is not None:
+                            cls._identityMap.discard(tuple(values[key] for key in cls._primary_key_cols))
+                else:
+                    for entry,values in batch:
+                        if isinstance(entry, dict):
+                            entry = cls(bypass_validation=True, **values)
+                        super(PlasticORM_Base,entry).__setattr__('_pending', list(values))
+                        entry._upsert()
+                count += len(batch)
+        
+        if count:
+            cls._invalidateResults()
+        return count
+
+
+    @classmethod
+    def update_where(cls, filters, **values):
+        """Set the values on every record matching the filters, in a single statement.
+        Returns the number of records changed.
+
+        The filters are PlasticColumn filters, like for find: one, or a list of them.
+            Task.update_where(Task.active[1], active=0)
+            Task.update_where([Task.active[0], Task.id[:100]], title='Old')
+        
+        Instances already loaded aren't changed, but any cached ones (and cached results) are dropped.
+        """
+        cls._configure()
+        filters = cls._filterList(filters)
+        if not values:
+            raise ValueError('Nothing given to update %s.%s with' % (cls._schema, cls._table))
+        for column,value in values.items():
+            cls._columnName(column)
+            if value is None and column in cls._not_nullable_cols:
+                raise ValueError('Can not null column %s in table %s.%s' % (column, cls._schema, cls._table))
+        
+        conditions,conditionValues = cls._splitFilters(filters)
+        with cls._connection as plasticDB:
+            count = plasticDB.updateWhere(cls._table, values, conditions, conditionValues)
+        
+        cls._invalidateCaches()
+        return count
+
+
+    @classmethod
+    def delete_where(cls, filters):
+        """Delete every record matching the filters, in a single statement.
+        Returns the number of records deleted.
+
+        The filters are given the same way as for update_where. To delete everything,
+          say so with a filter that matches it, like Task.id[:] (not null).
+        """
+        cls._configure()
+        filters = cls._filterList(filters)
+        
+        conditions,conditionValues = cls._splitFilters(filters)
+        with cls._connection as plasticDB:
+            count = plasticDB.deleteWhere(cls._table, conditions, conditionValues)
+        
+        cls._invalidateCaches()
+        return count
+
+
+    @classmethod
+    def _filterList(cls, filters):
+        """Accept a single filter or a sequence of them. At least one is required,
+          so a missing filter can't change the whole table by accident.
+        """
+        if filters and isinstance(filters[0], str):
+            filters = [filters]
+        filters = list(filters or [])
+        if not filters:
+            raise ValueError('A filter is required to change records in %s.%s in bulk' % (cls._schema, cls._table))
+        return filters
+
+
+    @classmethod
+    def _invalidateCaches(cls):
+        """After a bulk change there's no telling which records changed, so drop everything cached."""
+        cls._invalidateResults()
+        if cls._identityMap is not None:
+            cls._identityMap.clear()
+
+
     def _commit(self):
         """Apply the changes, if any."""
                 
@@ -361,8 +1162,11 @@ class PlasticORM_Base(object, metaclass=MetaPlasticORM):
         #   the engine will try to retrieve.
         # We'll do the same here, with the caveat that we'll update
         
+        # A record without its keys is new, so it can only be inserted
+        if self._unboundKeyColumns:
+            self._insert()
         # So: are we switching to another record? If so pull and update!
-        if set(self._pending) & set(self._primary_key_cols):            
+        elif set(self._pending) & set(self._primary_key_cols):            
             self._upsert()
         else:
             self._update()
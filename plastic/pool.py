@@ -0,0 +1,338 @@
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+import threading, weakref
+
+
+class ConnectionPool(object):
+    """A thread-safe pool of DB-API connections.
+
+    Connections are made with the connect callable given. The pool keeps at least
+      minSize of them open and never more than maxSize. If all are checked out,
+      checkout waits up to timeout seconds for one to come back (then raises TimeoutError).
+
+    On checkout, connections older than recycle seconds are replaced, and
+      the healthCheck callable (if any) is run against connections that sat idle
+      for at least healthCheckIdle seconds. If that raises, the connection is
+      dropped for a fresh one.
+    """
+    def __init__(self, connect, minSize=1, maxSize=10, timeout=30.0, recycle=None, healthCheck=None, healthCheckIdle=0.0):
+        self._connect = connect
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.timeout = timeout
+        self.recycle = recycle
+        self.healthCheck = healthCheck
+        self.healthCheckIdle = healthCheckIdle
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._openedAt = {}
+        self._lastUsed = {}
+        self.size = 0
+        self.inUse = 0
+
+        # metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.totalWait = 0.0
+        self.maxWait = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+        self.failedChecks = 0
+
+        # The minimum connections are opened on first checkout, not here,
+        #   so the pool can be made without a live database
+        self._filled = False
+
+
+    def _open(self):
+        connection = self._connect()
+        self._openedAt[id(connection)] = self._lastUsed[id(connection)] = monotonic()
+        return connection
+
+
+    def _close(self, connection):
+        self._openedAt.pop(id(connection), None)
+        self._lastUsed.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+    def _usable(self, connection):
+        """Check that an idle connection is still worth handing out."""
+        now = monotonic()
+        if self.recycle and now - self._openedAt.get(id(connection), 0) > self.recycle:
+            self.recycled += 1
+            return False
+        # A connection in steady use is known good, so don't spend a round trip on it
+        if self.healthCheck and now - self._lastUsed.get(id(connection), 0) >= self.healthCheckIdle:
+            try:
+                self.healthCheck(connection)
+            except Exception:
+                self.failedChecks += 1
+                return False
+        return True
+
+
+    def checkout(self):
+        """Get a connection for exclusive use. Be sure to check it back in!"""
+        start = monotonic()
+        deadline = None if self.timeout is None else start + self.timeout
+
+        with self._condition:
+            if not self._filled:
+                self._filled = True
+                while self.size < self.minSize:
+                    self._idle.append(self._open())
+                    self.size += 1
+
+            while not self._idle and self.size >= self.maxSize:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.timeouts += 1
+                    raise TimeoutError('No connection was free within %r seconds (%d in use)' % (self.timeout, self.inUse))
+                self._condition.wait(remaining)
+
+            connection = self._idle.popleft() if self._idle else None
+            if connection is None:
+                self.size += 1
+            self.inUse += 1
+
+        # Connecting and checking can be slow, so do it outside the lock
+        try:
+            if connection is not None and not self._usable(connection):
+                self._close(connection)
+                connection = None
+            if connection is None:
+                connection = self._open()
+        except:
+            with self._condition:
+                self.size -= 1
+                self.inUse -= 1
+                self._condition.notify()
+            raise
+
+        waited = monotonic() - start
+        with self._condition:
+            self.checkouts += 1
+            self.totalWait += waited
+            self.maxWait = max(self.maxWait, waited)
+            if waited > 0.001:
+                self.waits += 1
+        return connection
+
+
+    def checkin(self, connection):
+        """Return a connection to the pool."""
+        self._lastUsed[id(connection)] = monotonic()
+        with self._condition:
+            self.inUse -= 1
+            self._idle.append(connection)
+            self._condition.notify()
+
+
+    def discard(self, connection):
+        """Close a checked out connection instead of returning it (say, if it broke)."""
+        self._close(connection)
+        with self._condition:
+            self.inUse -= 1
+            self.size -= 1
+            self._condition.notify()
+
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.popleft())
+                self.size -= 1
+
+
+    @property
+    def stats(self):
+        return {
+            'size': self.size,
+            'inUse': self.inUse,
+            'idle': len(self._idle),
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+            'totalWait': self.totalWait,
+            'maxWait': self.maxWait,
+            'meanWait': (self.totalWait / self.checkouts) if self.checkouts else 0.0,
+            'timeouts': self.timeouts,
+            'recycled': self.recycled,
+            'failedChecks': self.failedChecks,
+        }
+
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, self.stats)
+
+
+class _ThreadConnection(object):
+    __slots__ = ('connection', 'release', '__weakref__')
+
+
+class ThreadConnectionPool(ConnectionPool):
+    """Pool that keeps one connection per thread, rather than sharing them out.
+
+    This suits engines like SQLite, where connections are cheap and best kept
+      on the thread that made them. Only the recycle and health checks apply.
+    A thread's connection is closed when the thread finishes.
+    """
+    def __init__(self, connect, recycle=None, healthCheck=None, healthCheckIdle=0.0, **unused):
+        super(ThreadConnectionPool, self).__init__(connect, minSize=0, maxSize=None,
+                                                   timeout=None, recycle=recycle, healthCheck=healthCheck,
+                                                   healthCheckIdle=healthCheckIdle)
+        self._local = threading.local()
+
+
+    def _release(self, connection):
+        self._close(connection)
+        with self._condition:
+            self.size -= 1
+
+
+    def checkout(self):
+        start = monotonic()
+        held = getattr(self._local, 'held', None)
+        if held is not None and not self._usable(held.connection):
+            held.release()
+            held = None
+
+        if held is None:
+            held = _ThreadConnection()
+            held.connection = self._open()
+            # Runs once: either when dropped here, or when the thread's locals are cleaned up
+            held.release = weakref.finalize(held, self._release, held.connection)
+            self._local.held = held
+            with self._condition:
+                self.size += 1
+
+        waited = monotonic() - start
+        with self._condition:
+            self.inUse += 1
+            self.checkouts += 1
+            self.totalWait += waited
+            self.maxWait = max(self.maxWait, waited)
+        return held.connection
+
+
+    def checkin(self, connection):
+        # It stays with the thread
+        self._lastUsed[id(connection)] = monotonic()
+        with self._condition:
+            self.inUse -= 1
+
+
+    def discard(self, connection):
+        with self._condition:
+            self.inUse -= 1
+        self.close()
+
+
+    def close(self):
+        """Close this thread's connection. (Other threads' close as they finish.)"""
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            self._local.held = None
+            held.release()
+
+
+class PooledConnection(object):
+    """Mix in ahead of an engine's connector so that every `with` block
+      checks out its own connection from a pool, and returns it at the end.
+
+      class Pooled_Mysql_Connector(PooledConnection, Mysql_Connector): pass
+
+    Blocks nest on a thread just like the plain connectors (one transaction for
+      the outermost block), but separate threads no longer share a connection.
+    The engine connector needs to provide _open_connection, _ping, and _end_transaction.
+    """
+    _poolType = ConnectionPool
+    _pool_min_size = 1
+    _pool_max_size = 10
+    _pool_timeout = 30.0
+    _pool_recycle = None
+    # Connections idle for at least this long are checked (pinged) before they're used again
+    _pool_health_check = True
+    _pool_health_check_idle = 30.0
+
+
+    def __init__(self, config):
+        self.config = config
+        self._local = threading.local()
+        self.pool = self._poolType(self._open_connection,
+                                   minSize=self._pool_min_size,
+                                   maxSize=self._pool_max_size,
+                                   timeout=self._pool_timeout,
+                                   recycle=self._pool_recycle,
+                                   healthCheck=self._ping if self._pool_health_check else None,
+                                   healthCheckIdle=self._pool_health_check_idle)
+
+
+    @property
+    def connection(self):
+        return getattr(self._local, 'connection', None)
+
+
+    @property
+    def _inBlock(self):
+        return getattr(self._local, 'depth', 0) > 0
+
+
+    @contextmanager
+    def _streamingConnection(self):
+        """Outside of a block, stream over a connection checked out just for it."""
+        if self._inBlock:
+            with self as plasticDB:
+                yield plasticDB.connection
+            return
+        
+        connection = self.pool.checkout()
+        excType = None
+        try:
+            yield connection
+        except BaseException as error:
+            excType = type(error)
+            raise
+        finally:
+            # Don't hand back a connection with a read transaction still open
+            try:
+                self._end_transaction(connection, excType)
+            except:
+                self.pool.discard(connection)
+                raise
+            self.pool.checkin(connection)
+
+
+    def connect(self, forceReconnect=False):
+        pass
+
+
+    def __enter__(self):
+        local = self._local
+        if not getattr(local, 'depth', 0):
+            local.connection = self.pool.checkout()
+            local.depth = 0
+        local.depth += 1
+        return self
+
+
+    def __exit__(self, excType, *args):
+        local = self._local
+        local.depth -= 1
+        if local.depth:
+            return
+
+        connection = local.connection
+        local.connection = None
+        try:
+            self._end_transaction(connection, excType)
+        except:
+            self.pool.discard(connection)
+            raise
+        self.pool.checkin(connection)
@@ -4,7 +4,7 @@ try:
 except ImportError:
     pass
 
-import re
+import re, functools
 
 try:
     from com.inductiveautomation.ignition.common import BasicDataset
@@ -87,15 +87,29 @@ def genRecordType(header):
     """Returns something like a namedtuple. 
     Designed to have lightweight instances while having many convenient ways
     to access the data.
+
+    Generated types are cached by their raw header, so queries that return
+    the same columns share the same RecordType. 
+    Check on the cache with genRecordType.cache_info()
     """
     if isinstance(header, BasicDataset):
         rawFields = tuple(h for h in header.getColumnNames())
     else:
         rawFields = tuple(h for h in header)    
 
+    return _cachedRecordType(rawFields)
+
+
+# Building the class costs more than many small queries do, so keep them around
+RECORD_TYPE_CACHE_SIZE = 256
+
+_unsafePattern = re.compile('[^a-zA-Z0-9_]')
+
+@functools.lru_cache(maxsize=RECORD_TYPE_CACHE_SIZE)
+def _cachedRecordType(rawFields):
+    """Generate the RecordType for the header's fields."""
     numericFieldPrefix = 'C'
-    unsafePattern = re.compile('[^a-zA-Z0-9_]')
-    sanitizedFields = [unsafePattern.sub('_', rf) for rf in rawFields]
+    sanitizedFields = [_unsafePattern.sub('_', rf) for rf in rawFields]
     for i,field in enumerate(sanitizedFields):
         if field[0].isdigit():
             sanitizedFields[i] = '%s%s' % (numericFieldPrefix, field)
@@ -131,3 +145,7 @@ def genRecordType(header):
         setattr(Record, '_cast', lambda self,v: tuple(v))
         
     return Record
+
+
+genRecordType.cache_info = _cachedRecordType.cache_info
+genRecordType.cache_clear = _cachedRecordType.cache_clear
@@ -1,6 +1,7 @@
 from .record import RecordType, genRecordType
 
-import functools, math
+import functools, math, threading
+from bisect import bisect_left, bisect_right
 
 try:
     from itertools import izip as zip
@@ -18,6 +19,28 @@ except ImportError:
         pass
 
 
+def datasetColumns(dataset):
+    """Pull the values out of an Ignition dataset a whole column at a time.
+       Each getValueAt is a call into Java, so going cell by cell is only
+         the fallback for datasets without getColumnAsList.
+    """
+    # PyDataSets wrap the actual dataset
+    if hasattr(dataset, 'getUnderlyingDataset'):
+        dataset = dataset.getUnderlyingDataset()
+    columnIxs = range(dataset.getColumnCount())
+    try:
+        getColumn = dataset.getColumnAsList
+    except AttributeError:
+        rowIxs = range(dataset.getRowCount())
+        return [[dataset.getValueAt(rix, cix) for rix in rowIxs] 
+                for cix in columnIxs]
+    return [list(getColumn(cix)) for cix in columnIxs]
+
+
+def isDataset(data):
+    return isinstance(data, BasicDataset) or hasattr(data, 'getUnderlyingDataset')
+
+
 class RecordSetColumn(object):
     __slots__ = ('_source', '_index')
     
@@ -53,8 +76,160 @@ class RecordSetColumn(object):
         'Format the representation string for better printing'
         return 'RecordSetColumn("%s" at %d)' % (self._source._RecordType._fields[self._index], self._index)
 
+
+
+class RecordSetIndex(object):
+    """Hash index of a RecordSet column: maps each value to the records holding it, in order.
+       The RecordSet keeps it up to date as groups are added.
+    """
+    __slots__ = ('_source', '_index', '_records')
+    ordered = False
+    
+    def __init__(self, recordSet, columnIndex):
+        self._source = recordSet
+        self._index = columnIndex
+        self.rebuild()
+
+    def rebuild(self):
+        self._records = {}
+        self.add(self._source._groups)
+
+    def add(self, groups):
+        ix = self._index
+        records = self._records
+        for group in groups:
+            for record in group:
+                value = record._tuple[ix]
+                try:
+                    records[value].append(record)
+                except KeyError:
+                    records[value] = [record]
+
+    def remove(self, groups):
+        """Drop the records of groups truncated off the front."""
+        ix = self._index
+        records = self._records
+        for group in groups:
+            for record in group:
+                value = record._tuple[ix]
+                matches = records[value]
+                # The oldest records are first, so this is usually the head
+                if matches[0] is record:
+                    del matches[0]
+                else:
+                    matches.remove(record)
+                if not matches:
+                    del records[value]
+
+    def lookup(self, value):
+        return tuple(self._records.get(value, ()))
+
+    def __contains__(self, value):
+        return value in self._records
+
+    def __repr__(self):
+        return '%s("%s" at %d)' % (type(self).__name__, self._source._RecordType._fields[self._index], self._index)
+
+
+class SortedRecordSetIndex(RecordSetIndex):
+    """Ordered index of a RecordSet column, for range lookups as well as equality.
+       Values are kept in a sorted list searched by bisection. Nulls are kept aside,
+         since they can't be ordered.
+    """
+    __slots__ = ('_values', '_nulls')
+    ordered = True
+    
+    def rebuild(self):
+        self._values = []
+        self._records = []
+        self._nulls = []
+        self.add(self._source._groups)
+
+    def add(self, groups):
+        ix = self._index
+        values = self._values
+        records = self._records
+        for group in groups:
+            for record in group:
+                value = record._tuple[ix]
+                if value is None:
+                    self._nulls.append(record)
+                # Data usually arrives in order, so appending is the common case
+                elif not values or not value < values[-1]:
+                    values.append(value)
+                    records.append(record)
+                else:
+                    position = bisect_right(values, value)
+                    values.insert(position, value)
+                    records.insert(position, record)
+
+    def remove(self, groups):
+        # Truncated records can be anywhere in the sort order
+        self.rebuild()
+
+    def lookup(self, value):
+        if value is None:
+            return tuple(self._nulls)
+        return tuple(self._records[bisect_left(self._values, value):bisect_right(self._values, value)])
+
+    def range(self, start=None, stop=None, inclusive=True):
+        """Records with values from start to stop, in value order. Either end may be left open."""
+        values = self._values
+        if start is None:
+            low = 0
+        else:
+            low = (bisect_left if inclusive else bisect_right)(values, start)
+        if stop is None:
+            high = len(values)
+        else:
+            high = (bisect_right if inclusive else bisect_left)(values, stop)
+        return tuple(self._records[low:high])
+
+    def __contains__(self, value):
+        if value is None:
+            return bool(self._nulls)
+        position = bisect_left(self._values, value)
+        return position < len(self._values) and self._values[position] == value
+
         
 
+class RecordSetScanner(object):
+    """Reads a RecordSet group by group, remembering where it left off.
+       It registers itself, so truncating only drops the groups it already read.
+
+           scanner = RecordSetScanner(recordSet)
+           for group in scanner.newGroups():
+               ...
+    """
+    __slots__ = ('__weakref__', '_source', 'cursor')
+
+    def __init__(self, recordSet, cursor=0):
+        self._source = recordSet
+        self.cursor = cursor
+        recordSet.register(self)
+
+    def newGroups(self):
+        """Yield the groups added since the last read, advancing the cursor."""
+        groups = self._source._groups
+        while self.cursor < len(groups):
+            group = groups[self.cursor]
+            self.cursor += 1
+            yield group
+
+    def oldestGroupNeeded(self, recordSet):
+        return self.cursor
+
+    def updateCursorsForRemoval(self, recordSet, groupCount):
+        self.cursor = max(self.cursor - groupCount, 0)
+
+    def close(self):
+        self._source.unregister(self)
+
+    def __repr__(self):
+        return 'RecordSetScanner(at group %d)' % self.cursor
+
+
+
 class RecordSet(object):
     """Holds groups of records. The gindex is the label for each of the tuples of Records.
     
@@ -64,38 +239,134 @@ class RecordSet(object):
     # References need to be weak to ensure garbage collection can continue like normal.
     _instances = WeakSet()
 
-    __slots__ = ('__weakref__', '_RecordType', '_groups', '_columns')
+    __slots__ = ('__weakref__', '_RecordType', '_groups', '_columns', '_offsets', '_indexes', '_scanners', '_window', '_subscribers', '_counted')
+
+    # When set, appending past this many records (across every RecordSet) triggers _truncateAll
+    _record_budget = None
+    _truncating = False
 
+    # Running total of the records held across every RecordSet, so checking
+    #   the budget doesn't mean walking all of them. Each adds what it holds (_counted).
+    _recordTotal = 0
+    _countLock = threading.RLock()
 
-    def __new__(cls, initialData=None,  recordType=None, initialLabel=None, validate=False, *args, **kwargs):
-        """See https://stackoverflow.com/a/12102666/1943640 for an example of this."""
-        instance = super(RecordSet, cls).__new__(cls, *args, **kwargs)
-        cls._instances.add(instance)
-        return instance
+
+    def _recount(self):
+        """Bring the running total in step with this RecordSet's record count."""
+        count = self._offsets[-1] - self._offsets[0]
+        with RecordSet._countLock:
+            RecordSet._recordTotal += count - self._counted
+            self._counted = count
+
+
+    def __del__(self):
+        # Not set if __init__ failed before counting anything
+        counted = getattr(self, '_counted', 0)
+        if counted:
+            with RecordSet._countLock:
+                RecordSet._recordTotal -= counted
 
     @classmethod
     def _truncateAll(cls):
-        instances = list(cls._instances)
-        for instance in instances:
-            instance.truncate()
+        """Truncate every RecordSet. Returns the number of groups dropped."""
+        # Appends made while truncating shouldn't set it off again
+        if RecordSet._truncating:
+            return 0
+        RecordSet._truncating = True
+        try:
+            instances = list(cls._instances)
+            return sum(instance.truncate() for instance in instances)
+        finally:
+            RecordSet._truncating = False
+
+    @classmethod
+    def totalRecordCount(cls):
+        return RecordSet._recordTotal
+
+    @classmethod
+    def setRecordBudget(cls, records):
+        """Bound the records held across all RecordSets (None for no limit).
+           Going over it truncates every RecordSet down to what its scanners still need.
+        """
+        RecordSet._record_budget = records
+        RecordSet._checkBudget()
+
+    @classmethod
+    def _checkBudget(cls):
+        budget = RecordSet._record_budget
+        if budget is not None and not RecordSet._truncating and RecordSet._recordTotal > budget:
+            RecordSet._truncateAll()
+
+    def register(self, scanner):
+        """Register a scanner (or any consumer) reading from this RecordSet.
+           It needs to provide:
+             oldestGroupNeeded(recordSet) - index of the oldest group it still needs,
+               or None if it needs none of them
+             updateCursorsForRemoval(recordSet, groupCount) - called after that many
+               groups were dropped from the front, so it can shift its cursors back
+           Scanners are only weakly referenced.
+        """
+        self._scanners.add(scanner)
+
+    def unregister(self, scanner):
+        self._scanners.discard(scanner)
+
+    @property
+    def window(self):
+        return self._window
+
+    @window.setter
+    def window(self, groups):
+        """Keep at most this many of the newest groups (None for no limit)."""
+        self._window = groups
+        if groups is not None and len(self._groups) > groups:
+            self.truncate()
 
     def truncate(self):
-        """Clear out data that is not unused.
+        """Clear out data that is not used.
            Cooperate with the scanners pointing to this RecordSet
-             by asking for a tuple declaring what records or groups
-             it needs.
+             by asking each which group is the oldest it needs.
            Only groups are truncated, and only from the beginning.
+           If no scanners are registered, nothing is known to be unneeded, so only
+             the window (if any) is enforced. The window wins over the scanners.
            Once completed, each listening scanner is notified
              so its cursors can be corrected accordingly.
+           Returns the number of groups dropped.
         """
-        raise NotImplementedError
+        listeningScanners = list(self._scanners)
 
-        safeGroupIx = -1
-        for scanner in listeningScanners:
-            pass
+        if listeningScanners:
+            safeGroupIx = len(self._groups)
+            for scanner in listeningScanners:
+                needed = scanner.oldestGroupNeeded(self)
+                if needed is not None:
+                    safeGroupIx = min(safeGroupIx, max(needed, 0))
+        else:
+            safeGroupIx = 0
+
+        if self._window is not None:
+            safeGroupIx = max(safeGroupIx, len(self._groups) - self._window)
+
+        if safeGroupIx <= 0:
+            return 0
+
+        self._removeGroups(safeGroupIx)
 
         for scanner in listeningScanners:
-            scanner.updateCursorsForRemoval(safeGroupIx)
+            scanner.updateCursorsForRemoval(self, safeGroupIx)
+        return safeGroupIx
+
+    def _removeGroups(self, groupCount):
+        """Drop the first groupCount groups, keeping the indexes in step."""
+        removed = self._groups[:groupCount]
+        del self._groups[:groupCount]
+        # Offsets stay absolute, so only the dropped entries need removing
+        del self._offsets[:groupCount]
+        self._recount()
+        for index in self._indexes.values():
+            index.remove(removed)
+        for subscriber in list(self._subscribers):
+            subscriber.groupsRemoved(self, removed)
 
 
     # INIT
@@ -103,27 +374,34 @@ class RecordSet(object):
         """Convert the DataSet type into a RecordSet
         """
         self._RecordType = genRecordType(dataset.getColumnNames())
-        columnIxs = range(len(self._RecordType._fields))
-        records = []
-        for rix in range(dataset.getRowCount()):
-            row = tuple(dataset.getValueAt(rix, cix) for cix in columnIxs)
-            records.append(self._RecordType(row))
-        self._groups = [tuple(records)]
+        columns = datasetColumns(dataset)
+        # Transpose once. (Single field records take the bare value.)
+        rows = columns[0] if len(columns) == 1 else zip(*columns)
+        self._groups = [tuple([self._RecordType(row) for row in rows])]
+        self._reindexGroups()
         
     def _initializeEmpty(self, RecordType):
         """Simply define what kind of RecordSet this will be, but start with no data.
         """
         self._RecordType = RecordType
         self._groups = []
+        self._reindexGroups()
     
     def _initializeRaw(self, RecordType, data):
         """Make a list with a single tuple entry, that was the list of new records.
            Using a generator as the tuple argument is about 4-10x slower.
         """
         self._RecordType = RecordType
+        if len(RecordType._fields) == 1:
+            # Rows straight from a cursor are still sequences with one field,
+            #   but single field records take the bare value
+            data = [record[0] if isinstance(record, (tuple,list)) and len(record) == 1 else record
+                    for record
+                    in data]
         self._groups = [tuple([RecordType(record) 
                                for record 
                                in data])]
+        self._reindexGroups()
     
     def _initializeRecords(self, records, validate=False):
         """Initialize RecordSet from the records provided.
@@ -134,23 +412,34 @@ class RecordSet(object):
         if validate:
             assert all(isinstance(r, RecordType) for r in records), 'All entries were not the same RecordType'
         self._groups = [tuple(records)]
+        self._reindexGroups()
 
     def _initializeCopy(self, recordSet):
         self._RecordType = recordSet._RecordType
         self._groups = [group for group in recordSet._groups]
+        self._offsets = list(recordSet._offsets)
+        self._recount()
         # Note that it'll regenerate indexes even on copy...
         
     
-    def __init__(self, initialData=None,  recordType=None, initialLabel=None, validate=False, *args, **kwargs):#, indexingFunction=None):        
+    def __init__(self, initialData=None,  recordType=None, initialLabel=None, validate=False, window=None, *args, **kwargs):#, indexingFunction=None):        
         """When creating a new RecordSet, the key is to provide an unambiguous RecordType,
              or at least enough information to define one.
+           A window can be given to keep only that many of the latest groups.
         """
         # Initialize mixins
         super(RecordSet, self).__init__(*args, **kwargs)
         
+        self._counted = 0
+        # Column indexes are opt-in (see createIndex) and never copied
+        self._indexes = {}
+        self._scanners = WeakSet()
+        self._window = window
+        self._subscribers = []
+        
         # We can initialize with a record type, a record, or an iterable of records
         # First check if it's a DataSet object. If so, convert it.
-        if isinstance(initialData, BasicDataset):
+        if isDataset(initialData):
             self._initializeDataSet(initialData)
         elif recordType:
             # create a RecordType, if needed
@@ -173,11 +462,185 @@ class RecordSet(object):
         self._columns = tuple(RecordSetColumn(self, ix) 
                               for ix 
                               in range(len(self._RecordType._fields)))
+        
+        if window is not None and len(self._groups) > window:
+            self.truncate()
+        
+        # Only tracked once it's fully made, so _truncateAll never sees one half done
+        RecordSet._instances.add(self)
             
             
     def clear(self):
         self._groups = []
-        
+        self.notify(slice(None), None)
+
+
+    # Positional index
+    def _reindexGroups(self):
+        """Rebuild the record offsets: _offsets[gix] is the index of the first
+             record in group gix, and the last entry is the total record count.
+           (Truncating leaves them relative to _offsets[0], rather than renumbering.)
+        """
+        offsets = [0]
+        total = 0
+        for group in self._groups:
+            total += len(group)
+            offsets.append(total)
+        self._offsets = offsets
+        self._recount()
+        for index in self._indexes.values():
+            index.rebuild()
+
+
+    # Change notification
+    def subscribe(self, subscriber):
+        """Have the subscriber told about changes to the groups, so it can keep up incrementally.
+           It needs to provide (see consumers.RecordSetConsumer):
+             groupsAdded(recordSet, groups) - after groups are appended
+             groupsRemoved(recordSet, groups) - after groups are truncated off the front
+             reset(recordSet) - after anything else, so it should start over
+        """
+        if not subscriber in self._subscribers:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+
+    def notify(self, oldSelector, newSelector):
+        """Called after groups are added (newSelector selects them, like -1 or slice(-n,None)).
+           Any other change (an oldSelector) rebuilds everything.
+           This keeps the positional index and any column indexes up to date,
+             then tells the subscribers.
+        """
+        if oldSelector is not None:
+            self._reindexGroups()
+            for subscriber in list(self._subscribers):
+                subscriber.reset(self)
+            return
+        offsets = self._offsets
+        if isinstance(newSelector, slice):
+            newGroups = self._groups[newSelector]
+        else:
+            newGroups = [self._groups[newSelector]]
+        if not newGroups:
+            return
+        for group in newGroups:
+            offsets.append(offsets[-1] + len(group))
+        self._recount()
+        for index in self._indexes.values():
+            index.add(newGroups)
+        for subscriber in list(self._subscribers):
+            subscriber.groupsAdded(self, newGroups)
+
+        if self._window is not None and len(self._groups) > self._window:
+            self.truncate()
+        if RecordSet._record_budget is not None:
+            RecordSet._checkBudget()
+
+
+    @property
+    def recordCount(self):
+        """The total number of records across all the groups."""
+        return self._offsets[-1] - self._offsets[0]
+
+
+    def groupOf(self, index):
+        """Returns the index of the group the record at index is in."""
+        return bisect_right(self._offsets, index + self._offsets[0]) - 1
+
+
+    # Column indexes
+    def createIndex(self, column, ordered=False):
+        """Index the column so lookup, where, and `in` don't have to scan every record.
+           A hash index is made by default; ordered=True makes a sorted one,
+             which also serves range lookups.
+           The index is kept up to date as groups are appended.
+        """
+        index = self._indexes.get(column)
+        if index is None or (ordered and not index.ordered):
+            indexType = SortedRecordSetIndex if ordered else RecordSetIndex
+            index = indexType(self, self._RecordType._lookup[column])
+            self._indexes[column] = index
+        return index
+
+
+    def dropIndex(self, column):
+        self._indexes.pop(column, None)
+
+
+    @property
+    def indexes(self):
+        return dict(self._indexes)
+
+
+    def lookup(self, column, value):
+        """Returns a tuple of the records where the column equals the value."""
+        index = self._indexes.get(column)
+        if index is not None:
+            return index.lookup(value)
+        ix = self._RecordType._lookup[column]
+        return tuple(record for record in self.records if record._tuple[ix] == value)
+
+
+    def where(self, **criteria):
+        """Returns a tuple of the records matching all the criteria, given as column=value.
+           Values can be like the selectors on PlasticColumns:
+             a list/tuple for any of several values, or a slice for a range
+             (between is inclusive, while open-ended slices are exclusive).
+           Indexes are used where they can be; the rest is filtered record by record.
+        """
+        if not criteria:
+            return tuple(self.records)
+
+        candidates = None
+        remaining = []
+        for column,selector in criteria.items():
+            ix = self._RecordType._lookup[column]
+            index = self._indexes.get(column)
+            if candidates is None and index is not None and (index.ordered or not isinstance(selector, slice)):
+                candidates = self._indexSelect(index, selector)
+            else:
+                remaining.append((ix, self._selectorTest(selector)))
+
+        if candidates is None:
+            candidates = self.records
+        return tuple(record
+                     for record in candidates
+                     if all(test(record._tuple[ix]) for ix,test in remaining))
+
+
+    @staticmethod
+    def _indexSelect(index, selector):
+        if isinstance(selector, slice):
+            if selector.start is not None and selector.stop is not None:
+                return index.range(selector.start, selector.stop)
+            return index.range(selector.start, selector.stop, inclusive=False)
+        elif isinstance(selector, (tuple,list)):
+            return tuple(record for value in dict.fromkeys(selector) for record in index.lookup(value))
+        else:
+            return index.lookup(selector)
+
+
+    @staticmethod
+    def _selectorTest(selector):
+        if isinstance(selector, slice):
+            start,stop = selector.start,selector.stop
+            if start is not None and stop is not None:
+                return lambda value: value is not None and start <= value <= stop
+            elif start is not None:
+                return lambda value: value is not None and value > start
+            elif stop is not None:
+                return lambda value: value is not None and value < stop
+            return lambda value: value is not None
+        elif isinstance(selector, (tuple,list)):
+            return lambda value: value in selector
+        else:
+            return lambda value: value == selector
+
         
     def column(self,column):
         return self._columns[self._RecordType._lookup[column]]
@@ -204,15 +667,17 @@ class RecordSet(object):
             column,slicer = selector
             return self.column(column)[slicer]
         elif isinstance(selector, slice):
-            return islice(self.records, selector)     
+            return islice(self.records, selector.start, selector.stop, selector.step)
         elif isinstance(selector, int):
             index = selector
-            for group in self._groups:
-                if len(group) > index:
-                    return group[index]
-                index -= len(group)
-            else:
-                raise IndexError("There are not enough records in the groups to meet the index %d" % index)
+            if index < 0:
+                index += self.recordCount
+            if not 0 <= index < self.recordCount:
+                raise IndexError("There are not enough records in the groups to meet the index %d" % selector)
+            # bisect to the last group starting at or before the index (skipping empty groups)
+            index += self._offsets[0]
+            gix = bisect_right(self._offsets, index) - 1
+            return self._groups[gix][index - self._offsets[gix]]
         else:
             raise NotImplementedError("The selector '%r' is not implemented" % selector)
             #return self._groups[selector]
@@ -240,6 +705,10 @@ class RecordSet(object):
              exhaustively searched.
         """
         if isinstance(search, self._RecordType):
+            # Any column index narrows it down to the records sharing a value
+            if self._indexes:
+                index = next(iter(self._indexes.values()))
+                return search in index.lookup(search._tuple[index._index])
             for group in self._groups:
                 if search in group:
                     return True
@@ -308,8 +777,10 @@ class RecordSet(object):
         """
         if isinstance(additionalGroups, RecordSet):
             assert self._RecordType._fields == additionalGroups._RecordType._fields, 'RecordSets can only be extended by other RecordSets of the same RecordType.'
+            # Counted from the front, so extending by nothing (or by itself) selects just what's new
+            start = len(self._groups)
             self._groups.extend(additionalGroups._groups)
-            self.notify(None, slice(-len(additionalGroups),None))
+            self.notify(None, slice(start, None))
         else:
             for group in additionalGroups:
                 self.append(group)
@@ -336,7 +807,7 @@ class RecordSet(object):
     def __repr__(self, elideLimit=20):
         'Format the representation string for better printing'
         records = list(islice((r for r in self.records), elideLimit))
-        totalRecordCount = sum(len(g) for g in self.groups)
+        totalRecordCount = self.recordCount
         out = ['RecordSet with %d groups of %d records' % (len(self), totalRecordCount)]
         # preprocess
         maxWidths = [max([len(f)] + [len(repr(v))+1 for v in column]) 
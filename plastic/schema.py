@@ -0,0 +1,152 @@
+"""Persisted cache of the schema that PlasticORM classes autoconfigure from.
+
+Defining a class normally queries the engine for its primary keys and columns.
+  With a schema cache file set, those results are saved (as JSON) and loaded
+  on the next run instead, so importing models is fast and needs no live database.
+
+    PlasticSqlite._schema_cache = './schema-cache.json'
+
+The _schema_cache_mode decides how the file is used:
+    'use'      - take the cached schema when there is one, query (and save) when not
+    'validate' - always query, and warn about (then save) anything that changed
+    'refresh'  - always query, and save over the cache
+
+To warm the cache ahead of time, import the model modules in refresh mode:
+    python -m plastic.schema ./schema-cache.json myproject.models [more.modules ...]
+"""
+import json, os, threading, warnings
+
+
+SCHEMA_CACHE_MODES = ('use', 'validate', 'refresh')
+
+# Connection settings that should never end up in a cache file (or its keys)
+SECRET_SETTINGS = ('password', 'passwd', 'secret')
+
+
+class SchemaCache(object):
+    """The cached schema entries for one cache file.
+
+    Entries are keyed by the connection info, schema, and table, and hold
+      the columns and keys the class would otherwise have autoconfigured.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries = {}
+        self.load()
+
+
+    def load(self):
+        with self._lock:
+            try:
+                with open(self.path) as cacheFile:
+                    self._entries = json.load(cacheFile)
+            except (IOError, OSError, ValueError):
+                self._entries = {}
+
+
+    def save(self):
+        """Write out the cache. It's swapped into place so readers never see half a file."""
+        with self._lock:
+            scratchPath = '%s.%d.tmp' % (self.path, os.getpid())
+            with open(scratchPath, 'w') as cacheFile:
+                json.dump(self._entries, cacheFile, indent=1, sort_keys=True)
+            os.replace(scratchPath, self.path)
+
+
+    @staticmethod
+    def key(dbInfo, schema, table):
+        if isinstance(dbInfo, dict):
+            dbInfo = dict((setting, value)
+                          for setting, value
+                          in dbInfo.items()
+                          if not setting in SECRET_SETTINGS)
+        return json.dumps([dbInfo, schema, table], sort_keys=True, default=str)
+
+
+    def get(self, dbInfo, schema, table):
+        with self._lock:
+            return self._entries.get(self.key(dbInfo, schema, table))
+
+
+    def put(self, dbInfo, schema, table, entry):
+        with self._lock:
+            self._entries[self.key(dbInfo, schema, table)] = entry
+            self.save()
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_schemaCaches = {}
+_schemaCachesLock = threading.Lock()
+
+def getSchemaCache(path):
+    """Classes sharing a cache file share one SchemaCache, so it's only read once."""
+    path = os.path.abspath(path)
+    with _schemaCachesLock:
+        if not path in _schemaCaches:
+            _schemaCaches[path] = SchemaCache(path)
+        return _schemaCaches[path]
+
+
+def schemaEntry(cls):
+    """The configuration of a PlasticORM class, as it's stored in the cache."""
+    return {
+        'columns': list(cls._columns),
+        'not_nullable_cols': list(cls._not_nullable_cols),
+        'primary_key_cols': list(cls._primary_key_cols),
+        'primary_key_auto': list(cls._primary_key_auto),
+    }
+
+
+def applySchemaEntry(cls, entry):
+    cls._columns = tuple(entry['columns'])
+    cls._not_nullable_cols = tuple(entry['not_nullable_cols'])
+    cls._primary_key_cols = tuple(entry['primary_key_cols'])
+    cls._primary_key_auto = tuple(entry['primary_key_auto'])
+    cls._values = [None]*len(cls._columns)
+
+
+def warnSchemaChanged(cls, cached, current):
+    changes = ', '.join(setting
+                        for setting
+                        in sorted(current)
+                        if cached.get(setting) != current[setting])
+    warnings.warn('Cached schema for %s.%s is out of date (%s changed)' % (cls._schema, cls._table, changes))
+
+
+def main(argv=None):
+    import argparse, importlib
+    from .plastic import PlasticORM_Base
+    # Run as a script this is __main__, so be sure to use the copy the classes use
+    from . import schema
+
+    parser = argparse.ArgumentParser(prog='python -m plastic.schema',
+                                     description='Warm a Plastic schema cache by importing the modules that define the PlasticORM classes.')
+    parser.add_argument('cache', help='Path to the schema cache file')
+    parser.add_argument('modules', nargs='+', help='Modules to import')
+    parser.add_argument('--mode', choices=SCHEMA_CACHE_MODES, default='refresh',
+                        help="'refresh' rewrites every entry (default), 'validate' also warns about changes")
+    args = parser.parse_args(argv)
+
+    PlasticORM_Base._schema_cache = args.cache
+    PlasticORM_Base._schema_cache_mode = args.mode
+
+    for module in args.modules:
+        importlib.import_module(module)
+
+    # Lazy classes skip configuring on import, so see to them now
+    subclasses = list(PlasticORM_Base.__subclasses__())
+    while subclasses:
+        cls = subclasses.pop()
+        subclasses.extend(cls.__subclasses__())
+        if cls._table and not cls._configured:
+            cls._configure()
+
+    print('%d tables cached in %s' % (len(schema.getSchemaCache(args.cache)), args.cache))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+from contextlib import ExitStack
+
+
+class Session(object):
+    """A unit of work: collects PlasticORM instances and applies all their
+      pending changes at once, instead of a statement (and commit) per change.
+
+    On flush, each class's changes are batched:
+      - new instances (no key values yet) are bulk inserted,
+      - instances with the same set of changed columns share one executemany update,
+      - instances switching to another record (a changed key) fall back to _commit.
+    All of it runs inside a single transaction on each connection involved.
+
+        with Session() as session:
+            for task in Task.find(Task.active[1]):
+                task.active = 0
+                session.add(task)
+        # ... everything is flushed (and committed once) here
+    """
+
+    def __init__(self, *instances):
+        self._tracked = []
+        self._trackedIds = set()
+        self.add(*instances)
+
+
+    def add(self, *instances):
+        """Track the instances, so their pending changes are applied on flush."""
+        for instance in instances:
+            if not id(instance) in self._trackedIds:
+                self._trackedIds.add(id(instance))
+                self._tracked.append(instance)
+
+
+    def discard(self, instance):
+        """Stop tracking the instance. Its changes stay pending on it."""
+        if id(instance) in self._trackedIds:
+            self._trackedIds.remove(id(instance))
+            self._tracked.remove(instance)
+
+
+    @property
+    def dirty(self):
+        """The tracked instances that have changes pending."""
+        return [instance for instance in self._tracked if instance._pending]
+
+
+    def flush(self):
+        """Apply all the pending changes. Returns the number of instances written."""
+        dirty = self.dirty
+        if not dirty:
+            return 0
+
+        # Group by class, so each table's changes can be batched together
+        byClass = {}
+        for instance in dirty:
+            byClass.setdefault(type(instance), []).append(instance)
+
+        # Hold every connection involved open, so they each commit only once, at the end
+        connections = []
+        for cls in byClass:
+            if not any(cls._connection is connection for connection in connections):
+                connections.append(cls._connection)
+
+        with ExitStack() as stack:
+            for connection in connections:
+                stack.enter_context(connection)
+
+            for cls,instances in byClass.items():
+                self._flushClass(cls, instances)
+
+        return len(dirty)
+
+
+    def _flushClass(self, cls, instances):
+        inserts = []
+        moves = []
+        updates = {}
+        for instance in instances:
+            if instance._unboundKeyColumns:
+                inserts.append(instance)
+            elif set(instance._pending) & set(cls._primary_key_cols):
+                moves.append(instance)
+            else:
+                instance._verifyNotNull()
+                setColumns = tuple(sorted(set(instance._pending)))
+                updates.setdefault(setColumns, []).append(instance)
+
+        if inserts:
+            cls.bulk_insert(inserts)
+
+        # Changing keys needs the retrieve-then-write of an upsert
+        for instance in moves:
+            instance._commit()
+
+        keyColumns = tuple(sorted(cls._primary_key_cols))
+        with cls._connection as plasticDB:
+            for setColumns,batch in updates.items():
+                rows = [tuple(getattr(instance, column) for column in setColumns + keyColumns)
+                        for instance
+                        in batch]
+                plasticDB.updateMany(cls._table, setColumns, keyColumns, rows)
+
+                for instance in batch:
+                    instance._pending = []
+                    instance._cacheSelf()
+        
+        if updates:
+            cls._invalidateResults()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, *args):
+        # Don't write out half-done work if something went wrong
+        if excType is None:
+            self.flush()
+
+
+    def __len__(self):
+        return len(self._tracked)
+
+
+    def __repr__(self):
+        return '<Session tracking %d instances (%d dirty)>' % (len(self._tracked), len(self.dirty))
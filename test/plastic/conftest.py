@@ -0,0 +1,28 @@
+import os, sqlite3
+
+import pytest
+
+from plastic.connectors.sqlite import PlasticSqlite
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'connectors', 'sqlite.base.sql')
+
+
+@pytest.fixture
+def sqlite_file(tmp_path):
+    """A fresh SQLite database file with the test schema (and its six tasks)."""
+    path = str(tmp_path / 'plastic.db')
+    connection = sqlite3.connect(path)
+    with open(SCHEMA_FILE) as rawsql:
+        connection.executescript(rawsql.read())
+    connection.close()
+    return path
+
+
+@pytest.fixture
+def make_task(sqlite_file):
+    """Make a Task class on the test database, with any class settings given."""
+    def make(base=PlasticSqlite, **attributes):
+        attributes.setdefault('_dbInfo', sqlite_file)
+        return type('Task', (base,), attributes)
+    return make
@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+
+def test_aggregates_over_filters(make_task):
+    Task = make_task()
+
+    assert Task.count() == 6
+    assert Task.count(Task.active[1]) == 3
+    assert Task.exists(Task.title['Skipped'])
+    assert not Task.exists(Task.id[100:])
+    assert Task.sum('id', Task.active[1]) == 1 + 2 + 6
+    assert Task.min(Task.id, Task.active[0]) == 3
+    assert Task.max(Task.id) == 6
+    assert Task.sum('id', Task.id[100:]) is None
+
+
+def test_group_by(make_task):
+    Task = make_task()
+
+    groups = Task.group_by(Task.active, tasks='count', newest=('max', Task.id))
+    assert [(group['active'], group['tasks'], group['newest']) for group in groups.records] == [(0, 3, 5), (1, 3, 6)]
+
+    with pytest.raises(ValueError):
+        Task.group_by(Task.active, tasks='median')
+
+
+def test_columns_named_like_aggregates(make_task, sqlite_file):
+    connection = sqlite3.connect(sqlite_file)
+    connection.executescript('''
+        CREATE TABLE tally (id INTEGER PRIMARY KEY, "count" INTEGER NOT NULL);
+        INSERT INTO tally VALUES (1, 5), (2, 7);
+        ''')
+    connection.close()
+    Tally = make_task(_table='tally')
+
+    # The column is still there to filter on...
+    assert Tally.count(Tally.count[7]) == 1
+    assert Tally.sum('count') == 12
+    # ...and on the instances it's the value
+    assert Tally(id=1).count == 5
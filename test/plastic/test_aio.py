@@ -0,0 +1,33 @@
+import asyncio
+
+from plastic.connectors.sqlite import PlasticSqlite, PlasticAsyncSqlite
+from plastic.aio import AsyncPlasticORM
+
+
+def test_async_calls_run_on_the_connections_executor(make_task):
+    Task = make_task(PlasticAsyncSqlite)
+
+    async def work():
+        tasks = await Task.afind(Task.active[1])
+        tasks[0].title = 'Changed'
+        await tasks[0].acommit()
+        return (len(tasks),
+                await Task.acount(),
+                await Task.aexists(Task.title['Changed']),
+                [task.id for task in await Task.aget_many([3, 100, 2])],
+                await Task._connection.queryAsync('select count(*) as total from task where active = PARAM_TOKEN', [1]))
+
+    found, total, changed, gotten, records = asyncio.run(work())
+    assert (found, total, changed, gotten) == (3, 6, True, [3, 2])
+    assert records[0]['total'] == 3
+    assert Task._connection._executor is not None
+    Task._connection.shutdown()
+
+
+def test_async_calls_without_an_async_connection(make_task):
+    Task = make_task(type('PlasticSomeAsyncSqlite', (AsyncPlasticORM, PlasticSqlite), {}))
+
+    async def gathered():
+        return await asyncio.gather(Task.acount(Task.active[0]), Task.acount(Task.active[1]))
+
+    assert asyncio.run(gathered()) == [3, 3]
@@ -0,0 +1,37 @@
+import pytest
+
+
+def test_update_where(make_task):
+    Task = make_task()
+
+    assert Task.update_where(Task.active[1], active=0) == 3
+    assert Task.count(Task.active[1]) == 0
+
+    assert Task.update_where([Task.active[0], Task.id[:3]], title='Old', description=None) == 2
+    assert [task.title for task in Task.find(Task.title['Old'])] == ['Old', 'Old']
+
+
+def test_update_where_checks_first(make_task):
+    Task = make_task()
+
+    with pytest.raises(ValueError):
+        Task.update_where([], active=0)
+    with pytest.raises(ValueError):
+        Task.update_where(Task.active[1])
+    with pytest.raises(ValueError):
+        Task.update_where(Task.active[1], title=None)
+    with pytest.raises(ValueError):
+        Task.update_where(Task.active[1], nonsense=1)
+    assert Task.count(Task.active[1]) == 3
+
+
+def test_delete_where(make_task):
+    Task = make_task()
+
+    assert Task.delete_where(Task.active[0]) == 3
+    assert [task.id for task in Task.find()] == [1, 2, 6]
+
+    with pytest.raises(ValueError):
+        Task.delete_where([])
+    assert Task.delete_where(Task.id[:]) == 3
+    assert Task.count() == 0
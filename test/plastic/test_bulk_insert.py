@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from plastic.connectors.sqlite import Sqlite_Connector
+
+
+@pytest.mark.parametrize('multiRowInsert', [True, False])
+def test_bulk_insert_fills_in_ids(make_task, monkeypatch, multiRowInsert):
+    # Engines without multi-row inserts (like Ignition's) go row by row
+    monkeypatch.setattr(Sqlite_Connector, '_multi_row_insert', multiRowInsert)
+    Task = make_task()
+
+    tasks = Task.bulk_insert([{'title': 'First', 'active': 1},
+                              Task(title='Second'),
+                              {'title': 'Third', 'active': 1}])
+
+    # Returned in the order given, though inserted grouped by their columns
+    assert [task.title for task in tasks] == ['First', 'Second', 'Third']
+    assert [task.id for task in tasks] == [7, 9, 8]
+    for task in tasks:
+        assert Task(id=task.id).title == task.title
+    # Left to the database's default
+    assert Task(id=9).active == 0
+
+
+def test_bulk_insert_is_all_or_nothing(make_task):
+    Task = make_task()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        # The second group is missing the (not nullable) title
+        Task.bulk_insert([{'title': 'First'}, {'active': 1}])
+    assert Task.count() == 6
+
+    with pytest.raises(ValueError):
+        Task.bulk_insert([{'title': 'First'}, {}])
+    assert Task.count() == 6
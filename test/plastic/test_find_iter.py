@@ -0,0 +1,16 @@
+def test_find_iter_streams_in_batches(make_task):
+    Task = make_task()
+
+    batches = list(Task.find_iter(Task.id[1:], batch_size=2, batches=True, order_by=Task.id))
+    assert [[task.id for task in batch] for batch in batches] == [[2, 3], [4, 5], [6]]
+
+
+def test_writes_between_batches(make_task):
+    Task = make_task()
+
+    # SQLite only holds the shared connection while reading a batch, so others can write meanwhile
+    for task in Task.find_iter(batch_size=2, order_by=Task.id):
+        Task.update_where(Task.id[[task.id]], active=1 - task.active)
+
+    assert Task.count(Task.active[1]) == 3
+    assert [task.id for task in Task.find(Task.active[1])] == [3, 4, 5]
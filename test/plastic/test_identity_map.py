@@ -0,0 +1,46 @@
+import gc
+
+
+def test_instances_are_shared_by_key(make_task):
+    Task = make_task(_identity_map_size=10)
+
+    task = Task(id=1)
+    assert Task(id=1) is task
+    assert Task.get_many([1, 2])[0] is task
+    assert [found for found in Task.find(Task.active[1]) if found.id == 1][0] is task
+
+
+def test_least_recently_used_are_evicted(make_task):
+    Task = make_task(_identity_map_size=2)
+
+    first = Task(id=1)
+    Task(id=2)
+    Task(id=3)
+
+    assert len(Task._identityMap) == 2
+    assert Task._identityMap.stats['evictions'] == 1
+    assert Task(id=1) is not first
+
+
+def test_weak_map_keeps_only_referenced_instances(make_task):
+    Task = make_task(_identity_map_size=1, _identity_map_weak=True)
+
+    first = Task(id=1)
+    Task(id=2)
+    gc.collect()
+
+    # The size bound doesn't apply, but only referenced instances stay
+    assert Task(id=1) is first
+    assert list(Task._identityMap._entries.keys()) == [(1,)]
+
+
+def test_bulk_writes_drop_cached_instances(make_task):
+    Task = make_task(_identity_map_size=10)
+
+    task = Task(id=1)
+    assert Task.update_where(Task.id[1], title='Changed') == 1
+    assert Task(id=1) is not task
+    assert Task(id=1).title == 'Changed'
+
+    assert Task.delete_where(Task.id[1]) == 1
+    assert Task.get_many([1]) == []
@@ -0,0 +1,26 @@
+def test_find_orders_and_limits(make_task):
+    Task = make_task()
+
+    assert [task.id for task in Task.find(order_by=Task.id.desc, limit=2)] == [6, 5]
+    assert [task.id for task in Task.find(order_by='-id', limit=2, offset=2)] == [4, 3]
+
+
+def test_keyset_pages_cover_everything_once(make_task):
+    Task = make_task()
+
+    # Sorting on a column with ties, so the key has to break them
+    pages = list(Task.find_pages(order_by=Task.active.desc, page_size=4))
+
+    assert [len(page) for page in pages] == [4, 2]
+    assert [task.id for page in pages for task in page] == [1, 2, 6, 3, 4, 5]
+
+
+def test_find_after_a_page_key(make_task):
+    Task = make_task()
+
+    first = Task.find_after(order_by='title', limit=2)
+    assert [task.title for task in first] == ['Another Thing', 'Inactive']
+
+    after = Task.page_key(first[-1], 'title')
+    assert after == ('Inactive', 4)
+    assert [task.title for task in Task.find_after(after=after, order_by='title', limit=2)] == ['Skipped', 'Some Task']
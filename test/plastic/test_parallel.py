@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from plastic.parallel import Fetch, FanOutError, fanOut, fanOutRecords
+from plastic.connectors.sqlite import PlasticPooledSqlite
+
+
+def test_results_come_back_in_order(make_task):
+    Task = make_task(PlasticPooledSqlite)
+
+    tasks, count, notes = fanOut([Fetch(Task.find, Task.active[1], order_by=Task.id),
+                                  Fetch(Task.count),
+                                  lambda: 'notes'])
+
+    assert [task.id for task in tasks] == [1, 2, 6]
+    assert count == 6
+    assert notes == 'notes'
+
+
+def test_fetches_on_one_plain_connection_share_a_lane(make_task):
+    Task = make_task()
+
+    lanes = set(fetch._lane() for fetch in [Fetch(Task.find), Fetch(Task.count)])
+    assert len(lanes) == 1
+    assert fanOut([Fetch(Task.count, Task.active[0]), Fetch(Task.count, Task.active[1])]) == [3, 3]
+
+
+def test_merging_records(make_task):
+    Task = make_task(PlasticPooledSqlite)
+
+    merged = fanOutRecords([Fetch(Task.find_records, Task.active[1]),
+                            Fetch(Task.find_records, Task.id[100:]),
+                            Fetch(Task.find_records, Task.active[0])])
+
+    assert merged.recordCount == 6
+    assert [len(group) for group in merged.groups] == [3, 0, 3]
+
+
+def test_failures_and_timeouts(make_task):
+    Task = make_task(PlasticPooledSqlite)
+    release = threading.Event()
+
+    def fail():
+        raise KeyError('missing')
+    fetches = [Fetch(Task.count), fail, lambda: release.wait(5)]
+
+    try:
+        with pytest.raises(FanOutError) as raised:
+            fanOut(fetches, timeout=0.1)
+        assert sorted(raised.value.errors) == [1, 2]
+        assert isinstance(raised.value.errors[2], TimeoutError)
+        assert raised.value.results[0] == 6
+
+        results = fanOut(fetches[:2], errors='return')
+        assert results[0] == 6
+        assert isinstance(results[1], KeyError)
+    finally:
+        release.set()
@@ -0,0 +1,65 @@
+import sqlite3, threading
+
+import pytest
+
+from plastic.pool import ConnectionPool
+from plastic.connectors.sqlite import PlasticPooledSqlite
+
+
+def connect():
+    return sqlite3.connect(':memory:')
+
+
+def test_checkout_waits_then_times_out():
+    pool = ConnectionPool(connect, minSize=0, maxSize=1, timeout=0.05)
+
+    connection = pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+
+    pool.checkin(connection)
+    assert pool.checkout() is connection
+    assert pool.stats['timeouts'] == 1
+
+
+def test_only_idle_connections_are_health_checked():
+    checked = []
+    pool = ConnectionPool(connect, minSize=0, maxSize=1,
+                          healthCheck=checked.append, healthCheckIdle=60.0)
+
+    connection = pool.checkout()
+    pool.checkin(connection)
+    assert pool.checkout() is connection
+    assert checked == []
+
+    # Long idle connections are checked, and dropped if that fails
+    def failCheck(connection):
+        raise sqlite3.OperationalError('gone away')
+    pool.checkin(connection)
+    pool.healthCheck = failCheck
+    pool.healthCheckIdle = 0.0
+    assert pool.checkout() is not connection
+    assert pool.stats['failedChecks'] == 1
+
+
+def test_pooled_threads_write_on_their_own_connections(make_task):
+    Task = make_task(PlasticPooledSqlite)
+    Task._configure()
+
+    connections = set()
+    # Hold every thread's connection at once, so none could be reused
+    together = threading.Barrier(4)
+    def work(ix):
+        with Task._connection as plasticDB:
+            connections.add(id(plasticDB.connection))
+            together.wait()
+            Task.bulk_insert([{'title': 'Thread %d' % ix}])
+
+    threads = [threading.Thread(target=work, args=(ix,)) for ix in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(connections) == 4
+    assert Task.count() == 6 + 4
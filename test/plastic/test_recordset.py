@@ -0,0 +1,59 @@
+import gc
+
+from plastic.recordset import RecordSet, RecordSetScanner
+
+
+def test_extend_by_empty_recordset():
+    recordSet = RecordSet(initialData=[(1, 'a'), (2, 'b')], recordType=('id', 'value'))
+    recordSet.extend(RecordSet(recordType=('id', 'value')))
+
+    assert len(recordSet) == 1
+    assert recordSet.recordCount == 2
+    assert recordSet._offsets == [0, 2]
+    assert recordSet[-1]['id'] == 2
+
+
+def test_extend_by_itself():
+    recordSet = RecordSet(initialData=[(1, 'a'), (2, 'b')], recordType=('id', 'value'))
+    recordSet.extend(recordSet)
+
+    assert len(recordSet) == 2
+    assert recordSet.recordCount == 4
+    assert [record['id'] for record in recordSet.records] == [1, 2, 1, 2]
+
+
+def test_total_record_count_keeps_up():
+    gc.collect()
+    before = RecordSet.totalRecordCount()
+
+    recordSet = RecordSet(initialData=[(1, 'a'), (2, 'b')], recordType=('id', 'value'), window=2)
+    assert RecordSet.totalRecordCount() == before + 2
+
+    recordSet.append([(3, 'c')])
+    recordSet.append([(4, 'd'), (5, 'e')])
+    # The window drops the first group
+    assert RecordSet.totalRecordCount() == before + 3
+
+    recordSet.clear()
+    assert RecordSet.totalRecordCount() == before
+
+    recordSet.append([(6, 'f')])
+    del recordSet
+    gc.collect()
+    assert RecordSet.totalRecordCount() == before
+
+
+def test_record_budget_truncates():
+    recordSet = RecordSet(recordType=('id', 'value'))
+    scanner = RecordSetScanner(recordSet)
+    RecordSet.setRecordBudget(RecordSet.totalRecordCount() + 3)
+    try:
+        recordSet.append([(1, 'a'), (2, 'b')])
+        assert len(list(scanner.newGroups())) == 1
+        recordSet.append([(3, 'c'), (4, 'd')])
+    finally:
+        RecordSet.setRecordBudget(None)
+
+    # The scanner was done with the older group, so going over the budget let it go
+    assert len(recordSet) == 1
+    assert recordSet.recordCount == 2
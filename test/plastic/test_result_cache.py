@@ -0,0 +1,59 @@
+def test_cached_records_are_the_callers_own(make_task):
+    Task = make_task(_result_cache_size=10)
+
+    first = Task.find_records(Task.active[1])
+    first.append([(99, 1, 'Extra', None)])
+    first.createIndex('title')
+
+    second = Task.find_records(Task.active[1])
+    assert second.recordCount == 3
+    assert not second.indexes
+    assert Task._resultCache.stats['hits'] == 1
+
+
+def test_empty_cached_results_can_be_copied(make_task):
+    Task = make_task(_result_cache_size=10)
+
+    assert Task.find_records(Task.id[100:]).recordCount == 0
+    assert Task.find_records(Task.id[100:]).recordCount == 0
+    assert Task.group_by(Task.active, Task.id[100:]).recordCount == 0
+
+
+def test_results_invalidated_while_querying_are_not_cached(make_task, monkeypatch):
+    Task = make_task(_result_cache_size=10)
+    Task._configure()
+
+    connection = Task._connection
+    query = connection.query
+    def queryDuringWrite(*args, **kwargs):
+        records = query(*args, **kwargs)
+        # Another thread writes to the table just after the records were read
+        Task.update_where(Task.id[1], title='Changed')
+        return records
+    monkeypatch.setattr(connection, 'query', queryDuringWrite)
+    assert Task.find_records(Task.id[1])[0]['title'] == 'Some Task'
+
+    monkeypatch.setattr(connection, 'query', query)
+    assert Task.find_records(Task.id[1])[0]['title'] == 'Changed'
+
+
+def test_writes_invalidate_cached_results(make_task):
+    Task = make_task(_result_cache_size=10)
+    Other = make_task(_result_cache_size=10)
+
+    assert Task.count(Task.active[1]) == 3
+    assert Other.count(Other.active[1]) == 3
+
+    task = Task(id=3)
+    task.active = 1
+    task._commit()
+    # Every class caching the table sees the change
+    assert Task.count(Task.active[1]) == 4
+    assert Other.count(Other.active[1]) == 4
+    assert Other._resultCache.stats['invalidations'] == 1
+
+    Task.bulk_insert([{'title': 'New', 'active': 1}])
+    assert Other.count(Other.active[1]) == 5
+
+    Task.delete_where(Task.active[1])
+    assert Other.count(Other.active[1]) == 0
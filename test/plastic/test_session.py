@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from plastic.session import Session
+
+
+def test_flush_applies_everything(make_task):
+    Task = make_task()
+
+    tasks = Task.find(Task.active[1])
+    new = Task(title='New', active=1)
+    with Session() as session:
+        for task in tasks:
+            task.active = 0
+            session.add(task)
+        session.add(new)
+        assert len(session.dirty) == 4
+
+    assert not session.dirty
+    assert new.id == 7
+    assert Task.count(Task.active[1]) == 1
+    assert Task(id=7).title == 'New'
+
+
+def test_failed_block_writes_nothing(make_task):
+    Task = make_task()
+
+    with pytest.raises(RuntimeError):
+        with Session() as session:
+            task = Task(id=1)
+            task.title = 'Changed'
+            session.add(task)
+            raise RuntimeError('Something went wrong')
+
+    assert task._pending == ['title']
+    assert Task(id=1).title == 'Some Task'
+
+
+def test_failed_flush_rolls_back(make_task):
+    Task = make_task()
+
+    first = Task(id=1)
+    first.title = 'Changed'
+    second = Task(id=2)
+    second.title = None
+    # Skip the not-null check, so the engine is what rejects it
+    second._not_nullable_cols = ()
+
+    session = Session(first, second)
+    with pytest.raises(sqlite3.IntegrityError):
+        session.flush()
+
+    assert Task(id=1).title == 'Some Task'
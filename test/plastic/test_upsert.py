@@ -0,0 +1,41 @@
+import sqlite3
+
+
+def test_upsert_many_inserts_and_updates(make_task):
+    Task = make_task()
+
+    written = Task.upsert_many([{'id': 1, 'active': 0, 'title': 'Changed'},
+                                {'id': 7, 'active': 1, 'title': 'New'}])
+    assert written == 2
+
+    assert Task(id=1).title == 'Changed'
+    assert Task(id=1).description == 'A first thing to do.'
+    assert Task(id=7).title == 'New'
+    assert Task.count() == 7
+
+
+def test_upsert_many_drops_stale_cached_instances(make_task):
+    Task = make_task(_identity_map_size=10)
+
+    cached = Task(id=1)
+    assert Task(id=1) is cached
+
+    Task.upsert_many([{'id': 1, 'active': 1, 'title': 'Changed'}])
+
+    assert Task(id=1).title == 'Changed'
+    assert Task.get_many([1])[0].title == 'Changed'
+
+
+def test_upsert_needs_sqlite_3_24(make_task, monkeypatch):
+    from plastic.connectors.sqlite import Sqlite_Connector
+    assert Sqlite_Connector.supportsUpsert == (sqlite3.sqlite_version_info >= (3,24,0))
+
+    # Older engines upsert row by row instead
+    monkeypatch.setattr(Sqlite_Connector, 'supportsUpsert', False)
+    Task = make_task(_identity_map_size=10)
+    Task(id=2)
+
+    assert Task.upsert_many([{'id': 2, 'active': 0, 'title': 'Changed'},
+                             {'id': 7, 'active': 1, 'title': 'New'}]) == 2
+    assert Task(id=2).title == 'Changed'
+    assert Task(id=7).title == 'New'